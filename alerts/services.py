@@ -1,6 +1,10 @@
+import hashlib
 from django.utils import timezone
 from datetime import timedelta
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Q
 from alerts.models import Alert, AlertType, UserAlert
 from pollination.models import PollinationRecord
 from germination.models import GerminationRecord
@@ -326,6 +330,14 @@ class NotificationService:
     Provides methods for retrieving and managing user notifications.
     """
     
+    # Seconds a computed notification summary stays cached. The key carries
+    # the summary version, so this only bounds how long an unchanged summary
+    # is reused across polls.
+    SUMMARY_CACHE_TIMEOUT = 30
+    
+    # Days of alerts counted as recent in the notification summary
+    RECENT_NOTIFICATION_DAYS = 7
+    
     @staticmethod
     def get_user_notifications(user, limit=None, unread_only=False):
         """
@@ -378,10 +390,7 @@ class NotificationService:
         ).count()
         
         # Get recent notifications (last 7 days)
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        recent_cutoff = timezone.now() - timedelta(days=7)
+        recent_cutoff = timezone.now() - timedelta(days=NotificationService.RECENT_NOTIFICATION_DAYS)
         recent_count = user_alerts.filter(
             alert__created_at__gte=recent_cutoff
         ).count()
@@ -396,6 +405,54 @@ class NotificationService:
             'has_unread': unread_count > 0
         }
     
+    @staticmethod
+    def get_notification_summary_version(user):
+        """
+        Get a version tag for the notification summary of a user.
+        
+        The tag changes whenever a user alert or its alert is created,
+        updated or deleted, and whenever an alert leaves the recent window,
+        so it can be used as an ETag and as part of the summary cache key.
+        
+        Args:
+            user: User instance
+            
+        Returns:
+            String with a hex digest identifying the current summary state
+        """
+        recent_cutoff = timezone.now() - timedelta(days=NotificationService.RECENT_NOTIFICATION_DAYS)
+        state = UserAlert.objects.filter(user=user).aggregate(
+            last_update=Max('updated_at'),
+            last_alert_update=Max('alert__updated_at'),
+            total=Count('id'),
+            recent=Count('id', filter=Q(alert__created_at__gte=recent_cutoff))
+        )
+        last_update = state['last_update'].isoformat() if state['last_update'] else ''
+        last_alert_update = state['last_alert_update'].isoformat() if state['last_alert_update'] else ''
+        raw_version = (
+            f"{user.pk}:{state['total']}:{state['recent']}:{last_update}:{last_alert_update}"
+        )
+        return hashlib.md5(raw_version.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def get_cached_notification_summary(user, version):
+        """
+        Get the notification summary for a user, cached per summary version.
+        
+        Args:
+            user: User instance
+            version: Version tag from get_notification_summary_version
+            
+        Returns:
+            Dictionary with notification counts and summary
+        """
+        cache_key = f"notification_summary:{user.pk}:{version}"
+        summary = cache.get(cache_key)
+        if summary is None:
+            summary = NotificationService.get_notification_summary(user)
+            cache.set(cache_key, summary, NotificationService.SUMMARY_CACHE_TIMEOUT)
+        return summary
+    
     @staticmethod
     def mark_notification_as_read(user, alert_id):
         """
@@ -445,15 +502,20 @@ class NotificationService:
         Returns:
             Number of notifications marked as read
         """
-        unread_alerts = UserAlert.objects.filter(
-            user=user, 
-            is_read=False
-        )
+        now = timezone.now()
         
-        count = 0
-        for user_alert in unread_alerts:
-            user_alert.mark_as_read()
-            count += 1
+        with transaction.atomic():
+            count = UserAlert.objects.filter(
+                user=user,
+                is_read=False
+            ).update(is_read=True, read_at=now, updated_at=now)
+            
+            # Keep the main alert status in sync, as UserAlert.mark_as_read does,
+            # for the rows the UPDATE above stamped with this read_at
+            if count:
+                Alert.objects.filter(
+                    id__in=UserAlert.objects.filter(user=user, read_at=now).values('alert_id')
+                ).update(status='read', updated_at=now)
             
         return count
     
@@ -5,9 +5,12 @@ from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 from datetime import timedelta, date
+from unittest.mock import patch
+import json
 
 from alerts.models import Alert, AlertType, UserAlert
 from alerts.services import NotificationService
+from alerts.views import NotificationViewSet
 from authentication.models import Role
 from pollination.models import PollinationRecord, Plant, PollinationType, ClimateCondition
 
@@ -195,6 +198,43 @@ class NotificationViewSetTest(TestCase):
         self.assertTrue(response.data['has_unread'])
         self.assertTrue(response.data['has_urgent'])
     
+    def test_notification_summary_not_modified(self):
+        """Test that summary returns 304 when the ETag still matches"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('alerts:notification-summary')
+        response = self.client.get(url)
+        etag = response['ETag']
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        # Reading a notification changes the summary version
+        self.user_alert1.mark_as_read()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['unread_notifications'], 1)
+    
+    def test_notification_summary_follows_alert_changes(self):
+        """Test that summary ETag changes with alert priority and the recent window"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('alerts:notification-summary')
+        etag = self.client.get(url)['ETag']
+        
+        self.alert1.priority = 'urgent'
+        self.alert1.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['urgent_notifications'], 2)
+        etag = response['ETag']
+        
+        # An alert leaving the recent window changes the summary too
+        later = timezone.now() + timedelta(days=8)
+        with patch('alerts.services.timezone.now', return_value=later):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['recent_notifications'], 0)
+    
     def test_unread_notifications(self):
         """Test unread notifications endpoint"""
         # Mark one notification as read
@@ -208,6 +248,21 @@ class NotificationViewSetTest(TestCase):
         self.assertEqual(len(response.data['results']), 1)
         self.assertEqual(response.data['results'][0]['id'], self.user_alert2.id)
     
+    def test_unread_notifications_streamed_without_pagination(self):
+        """Test that unpaginated notification lists are streamed as a JSON array"""
+        self.user_alert1.mark_as_read()
+        
+        self.client.force_authenticate(user=self.user)
+        url = reverse('alerts:notification-unread')
+        with patch.object(NotificationViewSet, 'pagination_class', None):
+            response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]['id'], self.user_alert2.id)
+    
     def test_notifications_by_type(self):
         """Test filtering notifications by type"""
         self.client.force_authenticate(user=self.user)
@@ -255,12 +310,22 @@ class NotificationViewSetTest(TestCase):
         response = self.client.post(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['message'], 'Marked 2 notifications as read')
         
         # Check that both notifications are marked as read
         self.user_alert1.refresh_from_db()
         self.user_alert2.refresh_from_db()
         self.assertTrue(self.user_alert1.is_read)
         self.assertTrue(self.user_alert2.is_read)
+        self.assertIsNotNone(self.user_alert1.read_at)
+        
+        # The main alerts follow the user alert status
+        self.alert1.refresh_from_db()
+        self.assertEqual(self.alert1.status, 'read')
+        
+        # Rows already read are not counted again
+        response = self.client.post(url)
+        self.assertEqual(response.data['message'], 'Marked 0 notifications as read')
     
     def test_bulk_action_mark_all_read(self):
         """Test bulk action to mark all notifications as read"""
@@ -1,9 +1,13 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db.models import Exists, OuterRef
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.utils.encoders import JSONEncoder
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResponse, OpenApiExample, OpenApiParameter
 
 from alerts.models import Alert, AlertType, UserAlert
@@ -55,10 +59,10 @@ class AlertViewSet(viewsets.ReadOnlyModelViewSet):
         if PermissionMixin.has_role_permission(user, 'Administrador'):
             return Alert.objects.all().select_related('alert_type')
         
-        # Regular users can only see their own alerts
+        # Regular users can only see their own alerts (semi-join, no DISTINCT needed)
         return Alert.objects.filter(
-            user_alerts__user=user
-        ).select_related('alert_type').distinct()
+            Exists(UserAlert.objects.filter(alert_id=OuterRef('pk'), user=user))
+        ).select_related('alert_type')
     
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
@@ -139,12 +143,41 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     ordering_fields = ['alert__scheduled_date', 'created_at', 'alert__priority']
     ordering = ['-alert__scheduled_date', '-created_at']
     
+    # Rows fetched per database round-trip when streaming unpaginated lists
+    STREAM_CHUNK_SIZE = 500
+    
     def get_queryset(self):
         """
         Return notifications for the current user only.
         """
         return NotificationService.get_user_notifications(self.request.user)
     
+    def _list_response(self, queryset):
+        """
+        Build the response for a list of notifications.
+        
+        Uses the configured paginator when available. Otherwise the rows are
+        streamed as a JSON array straight from a database cursor, so memory
+        stays bounded by the chunk size instead of the full result set.
+        """
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
+        serializer = self.get_serializer()
+        encoder = JSONEncoder()
+        
+        def stream():
+            yield '['
+            for index, notification in enumerate(queryset.iterator(chunk_size=self.STREAM_CHUNK_SIZE)):
+                if index:
+                    yield ','
+                yield encoder.encode(serializer.to_representation(notification))
+            yield ']'
+        
+        return StreamingHttpResponse(stream(), content_type='application/json')
+    
     @extend_schema(
         tags=['Alerts'],
         summary="Resumen de notificaciones",
@@ -178,9 +211,16 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def summary(self, request):
         """Get notification summary for the current user"""
-        summary = NotificationService.get_notification_summary(request.user)
+        version = NotificationService.get_notification_summary_version(request.user)
+        etag = f'W/"{version}"'
+        
+        # Polling clients send back the last ETag; skip the counts if nothing changed
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        summary = NotificationService.get_cached_notification_summary(request.user, version)
         serializer = NotificationSummarySerializer(summary)
-        return Response(serializer.data)
+        return Response(serializer.data, headers={'ETag': etag})
     
     @extend_schema(
         tags=['Alerts'],
@@ -214,13 +254,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
             unread_only=True
         )
         
-        page = self.paginate_queryset(notifications)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(notifications, many=True)
-        return Response(serializer.data)
+        return self._list_response(notifications)
     
     @action(detail=False, methods=['get'])
     def by_type(self, request):
@@ -237,13 +271,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
             alert_type
         )
         
-        page = self.paginate_queryset(notifications)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(notifications, many=True)
-        return Response(serializer.data)
+        return self._list_response(notifications)
     
     @action(detail=False, methods=['get'])
     def by_priority(self, request):
@@ -260,13 +288,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
             priority
         )
         
-        page = self.paginate_queryset(notifications)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(notifications, many=True)
-        return Response(serializer.data)
+        return self._list_response(notifications)
     
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "authentication"
+    
+    def ready(self):
+        """
+        Import signals when the app is ready.
+        This ensures that signal handlers are registered.
+        """
+        import authentication.signals
@@ -0,0 +1,122 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+# Upper bound, in seconds, for keeping a validated token in memory
+VALIDATED_TOKEN_CACHE_TIMEOUT = 60
+
+# Most validated tokens kept per process
+VALIDATED_TOKEN_CACHE_SIZE = 1024
+
+
+class ValidatedTokenCache:
+    """
+    In-process LRU of validated tokens, each kept until its own deadline.
+    
+    Entries are the token objects themselves, so a hit needs no decoding.
+    Access is serialized with a lock because worker threads share the
+    cache.
+    """
+    
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """
+        Return the token stored under key, or None if missing or expired.
+        
+        Args:
+            key (bytes): Digest of the raw token
+        
+        Returns:
+            Token: Validated token, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            token, deadline = entry
+            if deadline <= time.time():
+                del self._entries[key]
+                return None
+            
+            self._entries.move_to_end(key)
+            return token
+    
+    def set(self, key, token, deadline):
+        """
+        Store a token until a deadline, evicting the least recently used.
+        
+        Args:
+            key (bytes): Digest of the raw token
+            token (Token): Validated token
+            deadline (float): Unix time after which the entry is dropped
+        """
+        with self._lock:
+            self._entries[key] = (token, deadline)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """
+        Drop every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+validated_token_cache = ValidatedTokenCache(VALIDATED_TOKEN_CACHE_SIZE)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that keeps validated tokens in process memory.
+    
+    A token that passed signature and claim verification is kept by a hash
+    of its raw value, so repeated requests with the same token skip the
+    verification. An entry never outlives the token's expiry. Invalid
+    tokens are never cached.
+    """
+    
+    @staticmethod
+    def get_cache_key(raw_token):
+        """
+        Return the cache key for a raw token.
+        
+        Args:
+            raw_token (bytes): Encoded JWT from the Authorization header
+        
+        Returns:
+            bytes: Digest of the token
+        """
+        return hashlib.blake2b(raw_token, digest_size=16).digest()
+    
+    def get_validated_token(self, raw_token):
+        """
+        Return a validated token, verifying it only on a cache miss.
+        
+        Args:
+            raw_token (bytes): Encoded JWT from the Authorization header
+        
+        Returns:
+            Token: Validated token wrapper
+        """
+        cache_key = self.get_cache_key(raw_token)
+        validated_token = validated_token_cache.get(cache_key)
+        if validated_token is not None:
+            return validated_token
+        
+        # Raises InvalidToken before anything is cached
+        validated_token = super().get_validated_token(raw_token)
+        
+        # Never keep the entry past the token's own expiry
+        deadline = min(time.time() + VALIDATED_TOKEN_CACHE_TIMEOUT, validated_token['exp'])
+        validated_token_cache.set(cache_key, validated_token, deadline)
+        
+        return validated_token
@@ -1,13 +1,42 @@
-import json
+from functools import lru_cache
+from django.core.cache import cache
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
-from django.urls import resolve
+from django.urls import get_urlconf, resolve
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from .authentication import CachedJWTAuthentication
 
 User = get_user_model()
 
+# Only API requests go through role checks. The prefix is compared by slicing
+# so static, media and admin requests leave the middleware without a method call.
+API_PREFIX = '/api/'
+API_PREFIX_LENGTH = len(API_PREFIX)
+
+# Minimum seconds between two last_login writes for the same user
+LAST_LOGIN_UPDATE_INTERVAL = 60
+
+
+@lru_cache(maxsize=2048)
+def resolve_url_name(path, urlconf=None):
+    """
+    Return the namespaced URL name of a path, cached per process.
+    
+    URL patterns do not change at runtime, so each distinct path is only
+    matched against the resolver once. Paths that do not resolve raise
+    Resolver404 and are not cached.
+    
+    Args:
+        path (str): Request path
+        urlconf: URLconf in use for the request (None for ROOT_URLCONF)
+    
+    Returns:
+        str: URL name, prefixed with its namespace when it has one
+    """
+    resolved = resolve(path, urlconf)
+    return f"{resolved.namespace}:{resolved.url_name}" if resolved.namespace else resolved.url_name
+
 
 class RoleBasedPermissionMiddleware(MiddlewareMixin):
     """
@@ -50,18 +79,14 @@ class RoleBasedPermissionMiddleware(MiddlewareMixin):
         """
         Process request to check permissions.
         """
-        # Skip permission check for non-API requests
-        if not request.path.startswith('/api/'):
-            return None
+        path = request.path
         
-        # Skip for OPTIONS requests (CORS preflight)
-        if request.method == 'OPTIONS':
+        # Skip permission check for non-API requests and OPTIONS (CORS preflight)
+        if path[:API_PREFIX_LENGTH] != API_PREFIX or request.method == 'OPTIONS':
             return None
         
         try:
-            # Resolve URL to get view name
-            resolved = resolve(request.path)
-            url_name = f"{resolved.namespace}:{resolved.url_name}" if resolved.namespace else resolved.url_name
+            url_name = resolve_url_name(path, get_urlconf())
             
             # Check if URL is public
             if self._is_public_url(url_name):
@@ -107,7 +132,7 @@ class RoleBasedPermissionMiddleware(MiddlewareMixin):
         """
         try:
             # Try JWT authentication
-            jwt_auth = JWTAuthentication()
+            jwt_auth = CachedJWTAuthentication()
             auth_result = jwt_auth.authenticate(request)
             
             if auth_result:
@@ -151,10 +176,11 @@ class UserActivityMiddleware(MiddlewareMixin):
         Update user's last activity timestamp.
         """
         if hasattr(request, 'user') and request.user.is_authenticated:
-            # Update last login timestamp
-            from django.utils import timezone
-            request.user.last_login = timezone.now()
-            request.user.save(update_fields=['last_login'])
+            # Write the timestamp at most once per interval per user
+            if cache.add(f'last_login:{request.user.pk}', 1, LAST_LOGIN_UPDATE_INTERVAL):
+                from django.utils import timezone
+                request.user.last_login = timezone.now()
+                User.objects.filter(pk=request.user.pk).update(last_login=request.user.last_login)
         
         return None
 
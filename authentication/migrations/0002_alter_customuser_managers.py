@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-17 14:25
+
+import authentication.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="customuser",
+            managers=[
+                ("objects", authentication.models.CustomUserManager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-17 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0002_alter_customuser_managers"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(
+                fields=["role", "is_active"], name="user_role_active_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="role",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["is_active"],
+                name="role_active_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-17 14:55
+
+from django.db import migrations, models
+
+PERMISSION_FLAGS = {
+    "can_create": 1,
+    "can_read": 2,
+    "can_update": 4,
+    "can_delete": 8,
+    "can_generate_reports": 16,
+}
+
+MODULE_FLAGS = {
+    "pollination": 32,
+    "germination": 64,
+    "alerts": 128,
+    "reports": 256,
+    "authentication": 512,
+}
+
+
+def fill_permission_flags(apps, schema_editor):
+    Role = apps.get_model("authentication", "Role")
+    for role in Role.objects.all():
+        permissions = role.permissions or {}
+        role.permission_flags = sum(
+            bit for key, bit in PERMISSION_FLAGS.items() if permissions.get(key)
+        ) | sum(
+            MODULE_FLAGS.get(module, 0) for module in set(permissions.get("modules", []))
+        )
+        role.save(update_fields=["permission_flags"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0003_customuser_user_role_active_idx_role_role_active_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="role",
+            name="permission_flags",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                editable=False,
+                help_text="Permisos booleanos y módulos del rol como máscara de bits, calculada al guardar",
+            ),
+        ),
+        migrations.RunPython(fill_permission_flags, migrations.RunPython.noop),
+    ]
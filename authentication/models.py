@@ -1,19 +1,171 @@
+import copy
+from types import MappingProxyType
+from django.core.cache import cache
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.core.validators import RegexValidator
 from core.models import BaseModel
 
 
+# Shared by every phone field so the pattern is compiled only once
+PHONE_VALIDATOR = RegexValidator(
+    regex=r'^\+?1?\d{9,15}$',
+    message="El número de teléfono debe tener entre 9 y 15 dígitos."
+)
+
+# Bits of Role.permission_flags, one per boolean permission key
+CAN_CREATE = 1
+CAN_READ = 2
+CAN_UPDATE = 4
+CAN_DELETE = 8
+CAN_GENERATE_REPORTS = 16
+
+PERMISSION_FLAGS = MappingProxyType({
+    'can_create': CAN_CREATE,
+    'can_read': CAN_READ,
+    'can_update': CAN_UPDATE,
+    'can_delete': CAN_DELETE,
+    'can_generate_reports': CAN_GENERATE_REPORTS
+})
+
+# Bits of Role.permission_flags for the modules listed in the permissions
+MODULE_POLLINATION = 32
+MODULE_GERMINATION = 64
+MODULE_ALERTS = 128
+MODULE_REPORTS = 256
+MODULE_AUTHENTICATION = 512
+
+MODULE_FLAGS = MappingProxyType({
+    'pollination': MODULE_POLLINATION,
+    'germination': MODULE_GERMINATION,
+    'alerts': MODULE_ALERTS,
+    'reports': MODULE_REPORTS,
+    'authentication': MODULE_AUTHENTICATION
+})
+
+# Default permissions for each role type, built once at import time
+_DEFAULT_PERMISSIONS = MappingProxyType({
+    'Polinizador': {
+        'modules': ['pollination'],
+        'can_create': True,
+        'can_read': True,
+        'can_update': True,
+        'can_delete': False,
+        'can_generate_reports': False
+    },
+    'Germinador': {
+        'modules': ['germination'],
+        'can_create': True,
+        'can_read': True,
+        'can_update': True,
+        'can_delete': False,
+        'can_generate_reports': False
+    },
+    'Secretaria': {
+        'modules': ['pollination', 'germination', 'alerts'],
+        'can_create': True,
+        'can_read': True,
+        'can_update': True,
+        'can_delete': False,
+        'can_generate_reports': False
+    },
+    'Administrador': {
+        'modules': ['pollination', 'germination', 'alerts', 'reports', 'authentication'],
+        'can_create': True,
+        'can_read': True,
+        'can_update': True,
+        'can_delete': True,
+        'can_generate_reports': True
+    }
+})
+_EMPTY_PERMS = MappingProxyType({})
+
+# Cache key of the serialized active roles listed by RoleListView
+ACTIVE_ROLES_CACHE_KEY = 'roles:active'
+
+
+def get_permission_flags(permissions):
+    """
+    Return the bitmask of a role's JSON permissions.
+    
+    Args:
+        permissions (dict): Role permissions with boolean keys and a modules list
+    
+    Returns:
+        int: PERMISSION_FLAGS bits of the true keys and MODULE_FLAGS bits of
+        the known modules
+    """
+    return sum(
+        bit for key, bit in PERMISSION_FLAGS.items() if permissions.get(key)
+    ) | sum(
+        MODULE_FLAGS.get(module, 0) for module in set(permissions.get('modules', ()))
+    )
+
+
+class RoleQuerySet(models.QuerySet):
+    """
+    Role queryset whose bulk writes keep permission_flags in step.
+    
+    Bulk writes skip Role.save and its signals, so each of them recomputes
+    the bitmask of the permissions it writes and drops the cached list of
+    active roles itself.
+    """
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Create several roles in one INSERT.
+        
+        Applies the default permissions and bitmask that Role.save would set.
+        """
+        objs = list(objs)
+        for role in objs:
+            role.prepare_permissions()
+        roles = super().bulk_create(objs, *args, **kwargs)
+        cache.delete(ACTIVE_ROLES_CACHE_KEY)
+        return roles
+    
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        """
+        Update several roles, adding the bitmask when permissions change.
+        
+        The rows are written through update(), which drops the cached list.
+        """
+        if 'permissions' in fields:
+            objs = list(objs)
+            for role in objs:
+                role.permission_flags = get_permission_flags(role.permissions)
+            fields = [*fields, 'permission_flags']
+        return super().bulk_update(objs, fields, *args, **kwargs)
+    
+    def update(self, **kwargs):
+        """
+        Update the roles, adding the bitmask when permissions change.
+        
+        Unless the bitmask is passed too, as bulk_update does, the new
+        permissions must be a plain dict so the bitmask can be computed.
+        """
+        if 'permissions' in kwargs and 'permission_flags' not in kwargs:
+            kwargs['permission_flags'] = get_permission_flags(kwargs['permissions'])
+        rows = super().update(**kwargs)
+        cache.delete(ACTIVE_ROLES_CACHE_KEY)
+        return rows
+
+
 class Role(BaseModel):
     """
     Model to define user roles in the system.
     Each role has specific permissions stored as JSON.
     """
+    POLINIZADOR = 'Polinizador'
+    GERMINADOR = 'Germinador'
+    SECRETARIA = 'Secretaria'
+    ADMINISTRADOR = 'Administrador'
+    
     ROLE_CHOICES = [
-        ('Polinizador', 'Polinizador'),
-        ('Germinador', 'Germinador'),
-        ('Secretaria', 'Secretaria'),
-        ('Administrador', 'Administrador'),
+        (POLINIZADOR, 'Polinizador'),
+        (GERMINADOR, 'Germinador'),
+        (SECRETARIA, 'Secretaria'),
+        (ADMINISTRADOR, 'Administrador'),
     ]
     
     name = models.CharField(
@@ -34,11 +186,21 @@ class Role(BaseModel):
         default=True,
         help_text="Indica si el rol está activo en el sistema"
     )
+    permission_flags = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        help_text="Permisos booleanos y módulos del rol como máscara de bits, calculada al guardar"
+    )
+
+    objects = RoleQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Rol"
         verbose_name_plural = "Roles"
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['is_active'], condition=models.Q(is_active=True), name='role_active_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -46,52 +208,50 @@ class Role(BaseModel):
     def get_default_permissions(self):
         """
         Returns default permissions for each role type.
+        
+        The returned mapping is the shared module-level template; copy it
+        before storing it on a role.
         """
-        default_permissions = {
-            'Polinizador': {
-                'modules': ['pollination'],
-                'can_create': True,
-                'can_read': True,
-                'can_update': True,
-                'can_delete': False,
-                'can_generate_reports': False
-            },
-            'Germinador': {
-                'modules': ['germination'],
-                'can_create': True,
-                'can_read': True,
-                'can_update': True,
-                'can_delete': False,
-                'can_generate_reports': False
-            },
-            'Secretaria': {
-                'modules': ['pollination', 'germination', 'alerts'],
-                'can_create': True,
-                'can_read': True,
-                'can_update': True,
-                'can_delete': False,
-                'can_generate_reports': False
-            },
-            'Administrador': {
-                'modules': ['pollination', 'germination', 'alerts', 'reports', 'authentication'],
-                'can_create': True,
-                'can_read': True,
-                'can_update': True,
-                'can_delete': True,
-                'can_generate_reports': True
-            }
-        }
-        return default_permissions.get(self.name, {})
+        return _DEFAULT_PERMISSIONS.get(self.name, _EMPTY_PERMS)
+
+    def prepare_permissions(self):
+        """
+        Set default permissions if not provided and recompute the bitmask.
+        """
+        if not self.permissions:
+            self.permissions = copy.deepcopy(dict(self.get_default_permissions()))
+        
+        # Keep the bitmask in step with the JSON permissions
+        self.permission_flags = get_permission_flags(self.permissions)
 
     def save(self, *args, **kwargs):
         """
         Override save to set default permissions if not provided.
         """
-        if not self.permissions:
-            self.permissions = self.get_default_permissions()
+        self.prepare_permissions()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'permissions' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'permission_flags'}
+        
         super().save(*args, **kwargs)
 
 
+class CustomUserManager(UserManager):
+    """
+    User manager that always loads the role with the user.
+    
+    Permission checks read user.role on almost every request, so joining it
+    here saves a query per authenticated request (JWT and session backends
+    both fetch users through the default manager). The role's audit columns
+    are never read from a user and are left out of the join.
+    """
+    
+    def get_queryset(self):
+        return super().get_queryset().select_related('role').defer(
+            'role__created_at', 'role__updated_at'
+        )
+
+
 class CustomUser(AbstractUser):
     """
     Custom user model extending Django's AbstractUser.
@@ -115,12 +275,7 @@ class CustomUser(AbstractUser):
     phone_number = models.CharField(
         max_length=15,
         blank=True,
-        validators=[
-            RegexValidator(
-                regex=r'^\+?1?\d{9,15}$',
-                message="El número de teléfono debe tener entre 9 y 15 dígitos."
-            )
-        ],
+        validators=[PHONE_VALIDATOR],
         help_text="Número de teléfono del usuario"
     )
     is_active = models.BooleanField(
@@ -136,10 +291,15 @@ class CustomUser(AbstractUser):
         help_text="Fecha de última actualización del usuario"
     )
 
+    objects = CustomUserManager()
+
     class Meta:
         verbose_name = "Usuario"
         verbose_name_plural = "Usuarios"
         ordering = ['username']
+        indexes = [
+            models.Index(fields=['role', 'is_active'], name='user_role_active_idx'),
+        ]
 
     def __str__(self):
         return f"{self.username} - {self.get_full_name()}"
@@ -156,41 +316,41 @@ class CustomUser(AbstractUser):
         """
         return self.role and self.role.name == role_name
 
+    def has_permission_flag(self, flag):
+        """
+        Check a permission bit of the user's role.
+        
+        Args:
+            flag (int): One of the CAN_* bits
+        
+        Returns:
+            bool: True if the user's role has the bit set
+        """
+        return self.role_id is not None and bool(self.role.permission_flags & flag)
+
     def has_module_permission(self, module_name):
         """
         Check if user has permission to access a specific module.
+        
+        Tests the module's bit in the role's permission_flags, the same
+        check the permission classes use.
         """
         if self.is_superuser:
             return True
-        
-        if not self.role:
-            return False
-            
-        return module_name in self.role.permissions.get('modules', [])
+        module_flag = MODULE_FLAGS.get(module_name)
+        return module_flag is not None and self.has_permission_flag(module_flag)
 
     def can_delete_records(self):
         """
         Check if user can delete records.
         """
-        if self.is_superuser:
-            return True
-            
-        if not self.role:
-            return False
-            
-        return self.role.permissions.get('can_delete', False)
+        return self.is_superuser or self.has_permission_flag(CAN_DELETE)
 
     def can_generate_reports(self):
         """
         Check if user can generate reports.
         """
-        if self.is_superuser:
-            return True
-            
-        if not self.role:
-            return False
-            
-        return self.role.permissions.get('can_generate_reports', False)
+        return self.is_superuser or self.has_permission_flag(CAN_GENERATE_REPORTS)
 
 
 class UserProfile(BaseModel):
@@ -240,12 +400,7 @@ class UserProfile(BaseModel):
     emergency_contact_phone = models.CharField(
         max_length=15,
         blank=True,
-        validators=[
-            RegexValidator(
-                regex=r'^\+?1?\d{9,15}$',
-                message="El número de teléfono debe tener entre 9 y 15 dígitos."
-            )
-        ],
+        validators=[PHONE_VALIDATOR],
         help_text="Teléfono del contacto de emergencia"
     )
     preferences = models.JSONField(
@@ -1,8 +1,76 @@
 from rest_framework import permissions
 from rest_framework.exceptions import PermissionDenied
 from functools import wraps
+from django.db.models import BooleanField, Case, Value, When
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
+from .models import MODULE_FLAGS, PERMISSION_FLAGS, Role
+
+
+def _check_access(user, role=None, module=None, flag=None):
+    """
+    Shared access check for permission classes, decorators and mixins.
+    
+    Tests run from cheapest to most expensive: authentication, superuser,
+    role assignment and only then the role name, module or permission flag.
+    Superusers never touch the role.
+    
+    Args:
+        user: User instance (may be None or anonymous)
+        role (str): Role name the user must have
+        module (str): Module the user must have access to
+        flag (str): Permission key that must be true for the user's role
+    
+    Returns:
+        bool: True if every requested condition holds
+    """
+    if not user or not user.is_authenticated:
+        return False
+    
+    if user.is_superuser:
+        return True
+    
+    if not user.role_id:
+        return False
+    
+    if role is not None and not user.has_role(role):
+        return False
+    
+    if module is not None and not user.has_module_permission(module):
+        return False
+    
+    if flag is not None and not user.has_permission_flag(PERMISSION_FLAGS[flag]):
+        return False
+    
+    return True
+
+
+# Fields that link a record to the user who owns it, in lookup order
+OWNER_FIELDS = ('created_by', 'user', 'responsible')
+
+
+def annotate_is_owner(queryset, user):
+    """
+    Annotate each row with an ``_is_owner`` flag for the given user.
+    
+    IsOwnerOrAdminPermission reads the flag instead of dereferencing the
+    owner relation of every object, so no related row is loaded.
+    
+    Args:
+        queryset: Queryset of records with one of the OWNER_FIELDS
+        user: User to check ownership for
+    
+    Returns:
+        QuerySet: The annotated queryset
+    """
+    field_names = {field.name for field in queryset.model._meta.get_fields()}
+    whens = [
+        When(**{field: user, 'then': Value(True)})
+        for field in OWNER_FIELDS if field in field_names
+    ]
+    return queryset.annotate(
+        _is_owner=Case(*whens, default=Value(False), output_field=BooleanField())
+    )
 
 
 class RoleBasedPermission(permissions.BasePermission):
@@ -14,18 +82,16 @@ class RoleBasedPermission(permissions.BasePermission):
         """
         Check if user has permission based on their role.
         """
-        if not request.user or not request.user.is_authenticated:
+        user = request.user
+        if not user or not user.is_authenticated:
             return False
         
-        # Superuser has all permissions
-        if request.user.is_superuser:
+        if user.is_superuser:
             return True
         
-        # Check if user has an active role
-        if not request.user.role or not request.user.role.is_active:
-            return False
-        
-        return True
+        # Everyone else needs an active role. The user manager always loads
+        # the role, so this reads no extra row.
+        return user.role_id is not None and user.role.is_active
 
 
 class ModulePermission(permissions.BasePermission):
@@ -34,6 +100,35 @@ class ModulePermission(permissions.BasePermission):
     """
     required_module = None
     
+    # Bit of required_module in Role.permission_flags, set at class definition
+    module_flag = None
+    
+    # Required module resolved per view class, see get_required_module()
+    _resolved_modules = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._resolved_modules = {}
+        cls.module_flag = MODULE_FLAGS.get(cls.required_module)
+    
+    def get_required_module(self, view):
+        """
+        Return the module required by the view or, failing that, this class.
+        
+        The lookup through the view's class hierarchy is done once per view
+        class; a value passed to as_view() still takes precedence.
+        """
+        if 'required_module' in getattr(view, '__dict__', ()):
+            return view.required_module
+        
+        view_class = type(view)
+        try:
+            return self._resolved_modules[view_class]
+        except KeyError:
+            module = getattr(view_class, 'required_module', self.required_module)
+            self._resolved_modules[view_class] = module
+            return module
+    
     def has_permission(self, request, view):
         """
         Check if user has permission to access the required module.
@@ -41,16 +136,15 @@ class ModulePermission(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
         
-        # Superuser has all permissions
-        if request.user.is_superuser:
-            return True
-        
-        # Get required module from view or class attribute
-        module = getattr(view, 'required_module', self.required_module)
+        module = self.get_required_module(view)
         if not module:
             return True  # No specific module required
         
-        return request.user.has_module_permission(module)
+        # The class's own module needs a single bit test
+        if module == self.required_module and self.module_flag is not None:
+            return request.user.is_superuser or request.user.has_permission_flag(self.module_flag)
+        
+        return _check_access(request.user, module=module)
 
 
 class PollinationModulePermission(ModulePermission):
@@ -97,10 +191,7 @@ class CanDeleteRecordsPermission(permissions.BasePermission):
         """
         Check if user can delete records.
         """
-        if not request.user or not request.user.is_authenticated:
-            return False
-        
-        return request.user.can_delete_records()
+        return _check_access(request.user, flag='can_delete')
 
 
 class CanGenerateReportsPermission(permissions.BasePermission):
@@ -112,10 +203,7 @@ class CanGenerateReportsPermission(permissions.BasePermission):
         """
         Check if user can generate reports.
         """
-        if not request.user or not request.user.is_authenticated:
-            return False
-        
-        return request.user.can_generate_reports()
+        return _check_access(request.user, flag='can_generate_reports')
 
 
 class IsOwnerOrAdminPermission(permissions.BasePermission):
@@ -130,21 +218,18 @@ class IsOwnerOrAdminPermission(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
         
-        # Superuser has all permissions
-        if request.user.is_superuser:
+        # Superusers and admins (who can delete records) can access all objects
+        if _check_access(request.user, flag='can_delete'):
             return True
         
-        # Admin can access all objects
-        if request.user.can_delete_records():
-            return True
+        # Ownership flag computed by annotate_is_owner() in the queryset
+        if '_is_owner' in obj.__dict__:
+            return obj._is_owner
         
         # Check if user is the owner
-        if hasattr(obj, 'created_by'):
-            return obj.created_by == request.user
-        elif hasattr(obj, 'user'):
-            return obj.user == request.user
-        elif hasattr(obj, 'responsible'):
-            return obj.responsible == request.user
+        for field in OWNER_FIELDS:
+            if hasattr(obj, field):
+                return getattr(obj, field) == request.user
         
         return False
 
@@ -162,7 +247,7 @@ def require_role(required_role):
         @wraps(view_func)
         @login_required
         def wrapper(request, *args, **kwargs):
-            if not request.user.has_role(required_role) and not request.user.is_superuser:
+            if not _check_access(request.user, role=required_role):
                 if request.content_type == 'application/json':
                     return JsonResponse(
                         {'error': f'Se requiere el rol {required_role} para acceder a este recurso.'},
@@ -186,7 +271,7 @@ def require_module_permission(module_name):
         @wraps(view_func)
         @login_required
         def wrapper(request, *args, **kwargs):
-            if not request.user.has_module_permission(module_name) and not request.user.is_superuser:
+            if not _check_access(request.user, module=module_name):
                 if request.content_type == 'application/json':
                     return JsonResponse(
                         {'error': f'No tiene permisos para acceder al módulo {module_name}.'},
@@ -206,7 +291,7 @@ def require_admin_permission(view_func):
     @wraps(view_func)
     @login_required
     def wrapper(request, *args, **kwargs):
-        if not request.user.has_role('Administrador') and not request.user.is_superuser:
+        if not _check_access(request.user, role=Role.ADMINISTRADOR):
             if request.content_type == 'application/json':
                 return JsonResponse(
                     {'error': 'Se requieren permisos de administrador para acceder a este recurso.'},
@@ -225,7 +310,7 @@ def require_delete_permission(view_func):
     @wraps(view_func)
     @login_required
     def wrapper(request, *args, **kwargs):
-        if not request.user.can_delete_records():
+        if not _check_access(request.user, flag='can_delete'):
             if request.content_type == 'application/json':
                 return JsonResponse(
                     {'error': 'No tiene permisos para eliminar registros.'},
@@ -244,7 +329,7 @@ def require_reports_permission(view_func):
     @wraps(view_func)
     @login_required
     def wrapper(request, *args, **kwargs):
-        if not request.user.can_generate_reports():
+        if not _check_access(request.user, flag='can_generate_reports'):
             if request.content_type == 'application/json':
                 return JsonResponse(
                     {'error': 'No tiene permisos para generar reportes.'},
@@ -268,7 +353,7 @@ class RoleRequiredMixin:
         if not request.user.is_authenticated:
             raise PermissionDenied('Autenticación requerida.')
         
-        if self.required_role and not request.user.has_role(self.required_role) and not request.user.is_superuser:
+        if self.required_role and not _check_access(request.user, role=self.required_role):
             raise PermissionDenied(f'Se requiere el rol {self.required_role} para acceder a este recurso.')
         
         return super().dispatch(request, *args, **kwargs)
@@ -284,7 +369,7 @@ class ModulePermissionMixin:
         if not request.user.is_authenticated:
             raise PermissionDenied('Autenticación requerida.')
         
-        if self.required_module and not request.user.has_module_permission(self.required_module) and not request.user.is_superuser:
+        if self.required_module and not _check_access(request.user, module=self.required_module):
             raise PermissionDenied(f'No tiene permisos para acceder al módulo {self.required_module}.')
         
         return super().dispatch(request, *args, **kwargs)
@@ -299,7 +384,7 @@ class AdminRequiredMixin:
         if not request.user.is_authenticated:
             raise PermissionDenied('Autenticación requerida.')
         
-        if not request.user.has_role('Administrador') and not request.user.is_superuser:
+        if not _check_access(request.user, role=Role.ADMINISTRADOR):
             raise PermissionDenied('Se requieren permisos de administrador para acceder a este recurso.')
         
         return super().dispatch(request, *args, **kwargs)
@@ -314,7 +399,7 @@ class DeletePermissionMixin:
         if not request.user.is_authenticated:
             raise PermissionDenied('Autenticación requerida.')
         
-        if request.method == 'DELETE' and not request.user.can_delete_records():
+        if request.method == 'DELETE' and not _check_access(request.user, flag='can_delete'):
             raise PermissionDenied('No tiene permisos para eliminar registros.')
         
         return super().dispatch(request, *args, **kwargs)
@@ -329,7 +414,7 @@ class ReportsPermissionMixin:
         if not request.user.is_authenticated:
             raise PermissionDenied('Autenticación requerida.')
         
-        if not request.user.can_generate_reports():
+        if not _check_access(request.user, flag='can_generate_reports'):
             raise PermissionDenied('No tiene permisos para generar reportes.')
         
         return super().dispatch(request, *args, **kwargs)
\ No newline at end of file
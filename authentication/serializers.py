@@ -1,3 +1,4 @@
+import copy
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -7,8 +8,63 @@ from .models import Role, UserProfile
 
 User = get_user_model()
 
+# User fields that get_token embeds as JWT claims
+TOKEN_USER_CLAIMS = ('username', 'email', 'role', 'employee_id')
 
-class RoleSerializer(serializers.ModelSerializer):
+
+def _wants_token_user_data(context):
+    """
+    Return True if the client asked for the user data from the token claims.
+    
+    Clients opt in with ``?user=claims``; the full serialized user stays the
+    default response.
+    """
+    request = context.get('request')
+    return request is not None and request.query_params.get('user') == 'claims'
+
+
+def _user_data_from_token(token):
+    """
+    Build the user data from the claims embedded in a token.
+    
+    Args:
+        token: Decoded JWT token
+    
+    Returns:
+        dict: The user id and claim fields, or None if the token was issued
+        without the custom claims (e.g. by RefreshToken.for_user)
+    """
+    if any(claim not in token for claim in TOKEN_USER_CLAIMS):
+        return None
+    
+    data = {'id': token['user_id']}
+    for claim in TOKEN_USER_CLAIMS:
+        data[claim] = token[claim]
+    return data
+
+
+class CachedFieldsMixin:
+    """
+    Serializer mixin that builds the model fields once per class.
+    
+    ModelSerializer.get_fields() inspects the model and builds every field
+    on each instantiation. The built fields are kept as an unbound template
+    on the class, and each instance gets a deep copy of it, as DRF does for
+    declared fields, so no field is ever shared between two serializers.
+    Only use it on serializers whose fields do not depend on the context.
+    """
+    
+    def get_fields(self):
+        cls = type(self)
+        # Looked up on the class itself so subclasses build their own template
+        template = cls.__dict__.get('_fields_template')
+        if template is None:
+            template = super().get_fields()
+            cls._fields_template = template
+        return copy.deepcopy(template)
+
+
+class RoleSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Role model.
     """
@@ -18,7 +74,7 @@ class RoleSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for UserProfile model.
     """
@@ -32,7 +88,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for CustomUser model.
     """
@@ -55,6 +111,16 @@ class UserSerializer(serializers.ModelSerializer):
             'password_confirm': {'write_only': True}
         }
     
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Load the nested role and profile together with the users.
+        
+        Call it on any queryset serialized with many=True so the nested
+        serializers do not run one query per user.
+        """
+        return queryset.select_related('role', 'profile')
+    
     def validate(self, attrs):
         """
         Validate password confirmation.
@@ -68,11 +134,8 @@ class UserSerializer(serializers.ModelSerializer):
         """
         Validate that the role exists.
         """
-        if value is not None:
-            try:
-                Role.objects.get(id=value, is_active=True)
-            except Role.DoesNotExist:
-                raise serializers.ValidationError("El rol especificado no existe o no está activo.")
+        if value is not None and not Role.objects.filter(id=value, is_active=True).exists():
+            raise serializers.ValidationError("El rol especificado no existe o no está activo.")
         return value
     
     def create(self, validated_data):
@@ -83,11 +146,8 @@ class UserSerializer(serializers.ModelSerializer):
         password = validated_data.pop('password')
         role_id = validated_data.pop('role_id', None)
         
-        user = User.objects.create_user(password=password, **validated_data)
-        
-        if role_id:
-            user.role_id = role_id
-            user.save()
+        # Assign the role in the same INSERT instead of a follow-up UPDATE
+        user = User.objects.create_user(password=password, role_id=role_id, **validated_data)
         
         return user
     
@@ -123,12 +183,35 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         """
         data = super().validate(attrs)
         
+        # Same fields as the token claims, without serializing the profile
+        if _wants_token_user_data(self.context):
+            data['user'] = {'id': self.user.id, **self.get_user_claims(self.user)}
+            return data
+        
         # Add user information to the response
         user_data = UserSerializer(self.user).data
         data['user'] = user_data
         
         return data
     
+    @staticmethod
+    def get_user_claims(user):
+        """
+        Return the custom claims embedded in the user's tokens.
+        
+        Args:
+            user: User the token is issued for
+        
+        Returns:
+            dict: Claim values keyed by TOKEN_USER_CLAIMS
+        """
+        return {
+            'username': user.username,
+            'email': user.email,
+            'role': user.get_role_name(),
+            'employee_id': user.employee_id if user.employee_id else None
+        }
+    
     @classmethod
     def get_token(cls, user):
         """
@@ -137,10 +220,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
         
         # Add custom claims
-        token['username'] = user.username
-        token['email'] = user.email
-        token['role'] = user.get_role_name() if user.role else None
-        token['employee_id'] = user.employee_id if user.employee_id else None
+        for claim, value in cls.get_user_claims(user).items():
+            token[claim] = value
         
         return token
 
@@ -199,8 +280,15 @@ class TokenRefreshSerializer(serializers.Serializer):
                 'refresh': str(refresh)
             }
             
-            # Add user information
-            user = User.objects.get(id=refresh['user_id'])
+            # The claims already carry the basic user fields; no query needed
+            if _wants_token_user_data(self.context):
+                user_data = _user_data_from_token(refresh)
+                if user_data is not None:
+                    data['user'] = user_data
+                    return data
+            
+            # Add user information (role and profile in the same query)
+            user = UserSerializer.setup_eager_loading(User.objects.all()).get(id=refresh['user_id'])
             data['user'] = UserSerializer(user).data
             
             return data
@@ -0,0 +1,108 @@
+from django.core.signals import setting_changed
+from django.core.cache import cache
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from authentication.authentication import validated_token_cache
+from authentication.middleware import resolve_url_name
+from authentication.models import (
+    ACTIVE_ROLES_CACHE_KEY, CustomUser, Role, UserProfile, get_permission_flags
+)
+from authentication.views import get_auth_status_cache_key
+
+
+@receiver(pre_save, sender=Role)
+def set_fixture_role_flags(sender, instance, raw, **kwargs):
+    """
+    Signal handler to compute the bitmask of roles loaded from fixtures.
+    
+    loaddata saves roles raw, bypassing Role.save, so the bitmask is
+    computed here from the permissions being stored.
+    
+    Args:
+        sender: The model class (Role)
+        instance: The role being saved
+        raw (bool): Whether the role is saved exactly as given (fixtures)
+        **kwargs: Additional keyword arguments
+    """
+    if raw:
+        instance.permission_flags = get_permission_flags(instance.permissions)
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def clear_active_roles_cache(sender, instance, **kwargs):
+    """
+    Signal handler to drop the cached list of active roles when a role changes.
+    
+    Args:
+        sender: The model class (Role)
+        instance: The role being saved or deleted
+        **kwargs: Additional keyword arguments
+    """
+    cache.delete(ACTIVE_ROLES_CACHE_KEY)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def clear_user_auth_status(sender, instance, **kwargs):
+    """
+    Signal handler to drop the cached auth_status payload of a changed user.
+    
+    Args:
+        sender: The model class (CustomUser or UserProfile)
+        instance: The user or profile being saved or deleted
+        **kwargs: Additional keyword arguments
+    """
+    user_id = instance.pk if sender is CustomUser else instance.user_id
+    cache.delete(get_auth_status_cache_key(user_id))
+
+
+@receiver(post_save, sender=Role)
+@receiver(pre_delete, sender=Role)
+def clear_role_users_auth_status(sender, instance, **kwargs):
+    """
+    Signal handler to drop the cached auth_status payloads of a role's users.
+    
+    The payloads include the role, and the users themselves are not saved
+    when it changes, so their entries are dropped here.
+    
+    Args:
+        sender: The model class (Role)
+        instance: The role being saved or deleted
+        **kwargs: Additional keyword arguments
+    """
+    if kwargs.get('created'):
+        return
+    
+    user_ids = CustomUser.objects.filter(role=instance).values_list('pk', flat=True)
+    cache.delete_many([get_auth_status_cache_key(user_id) for user_id in user_ids])
+
+
+@receiver(setting_changed)
+def clear_resolved_url_names(sender, setting, **kwargs):
+    """
+    Signal handler to drop cached URL names when the URLconf setting changes.
+    
+    Args:
+        sender: The settings class
+        setting (str): Name of the changed setting
+        **kwargs: Additional keyword arguments
+    """
+    if setting == 'ROOT_URLCONF':
+        resolve_url_name.cache_clear()
+
+
+@receiver(setting_changed)
+def clear_validated_tokens(sender, setting, **kwargs):
+    """
+    Signal handler to drop cached validated tokens when the JWT settings change.
+    
+    Args:
+        sender: The settings class
+        setting (str): Name of the changed setting
+        **kwargs: Additional keyword arguments
+    """
+    if setting == 'SIMPLE_JWT':
+        validated_token_cache.clear()
@@ -1,13 +1,20 @@
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, override_settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.http import JsonResponse
-from rest_framework.test import APITestCase, APIClient
+from django.urls import resolve
+from rest_framework.test import APITestCase
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from unittest.mock import Mock, patch
-from .models import Role
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+from .authentication import CachedJWTAuthentication, ValidatedTokenCache, validated_token_cache
+from .models import MODULE_AUTHENTICATION, MODULE_POLLINATION, Role, UserProfile
 from .permissions import (
     RoleBasedPermission,
     ModulePermission,
@@ -19,6 +26,7 @@ from .permissions import (
     CanDeleteRecordsPermission,
     CanGenerateReportsPermission,
     IsOwnerOrAdminPermission,
+    annotate_is_owner,
     require_role,
     require_module_permission,
     require_admin_permission,
@@ -31,6 +39,7 @@ from .permissions import (
     ReportsPermissionMixin
 )
 from .middleware import (
+    resolve_url_name,
     RoleBasedPermissionMiddleware,
     UserActivityMiddleware,
     SecurityHeadersMiddleware,
@@ -40,77 +49,135 @@ from .middleware import (
 User = get_user_model()
 
 
+class _StubView:
+    """View stand-in for permission checks that read nothing from the view."""
+    __slots__ = ()
+
+
+STUB_VIEW = _StubView()
+
+
+def create_test_roles(*names):
+    """Create the named roles with a single INSERT, returned in the same order."""
+    return Role.objects.bulk_create([Role(name=name) for name in names])
+
+
+def create_test_user(username, **extra_fields):
+    """Create a user with an unusable password for tests that never log in."""
+    user = User(username=username, **extra_fields)
+    user.set_unusable_password()
+    user.save()
+    return user
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
 class PermissionClassesTest(TestCase):
     """
     Test cases for permission classes.
     """
     
-    def setUp(self):
+    factory = RequestFactory()
+    
+    # Permission classes only read request.user and request.method, so each
+    # test rebinds the user on these shared requests
+    GET = factory.get('/')
+    DELETE = factory.delete('/')
+    
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.factory = RequestFactory()
-        
         # Create roles
-        self.polinizador_role = Role.objects.create(name='Polinizador')
-        self.germinador_role = Role.objects.create(name='Germinador')
-        self.secretaria_role = Role.objects.create(name='Secretaria')
-        self.admin_role = Role.objects.create(name='Administrador')
+        cls.polinizador_role, cls.germinador_role, cls.secretaria_role, cls.admin_role = (
+            create_test_roles(Role.POLINIZADOR, Role.GERMINADOR, Role.SECRETARIA, Role.ADMINISTRADOR)
+        )
         
         # Create users
-        self.polinizador = User.objects.create_user(
+        cls.polinizador = create_test_user(
             username='polinizador',
-            password='pass123',
-            role=self.polinizador_role
+            role=cls.polinizador_role
         )
         
-        self.germinador = User.objects.create_user(
+        cls.germinador = create_test_user(
             username='germinador',
-            password='pass123',
-            role=self.germinador_role
+            role=cls.germinador_role
         )
         
-        self.secretaria = User.objects.create_user(
+        cls.secretaria = create_test_user(
             username='secretaria',
-            password='pass123',
-            role=self.secretaria_role
+            role=cls.secretaria_role
         )
         
-        self.admin = User.objects.create_user(
+        cls.admin = create_test_user(
             username='admin',
-            password='pass123',
-            role=self.admin_role
+            role=cls.admin_role
         )
         
-        self.superuser = User.objects.create_superuser(
+        cls.superuser = User.objects.create_superuser(
             username='superuser',
-            password='pass123',
             email='super@example.com'
         )
         
-        self.anonymous_user = None
+        cls.anonymous_user = None
     
     def test_role_based_permission(self):
         """Test RoleBasedPermission class."""
         permission = RoleBasedPermission()
-        view = Mock()
-        
-        # Test with authenticated user
-        request = self.factory.get('/')
-        request.user = self.polinizador
-        self.assertTrue(permission.has_permission(request, view))
+        view = STUB_VIEW
         
-        # Test with superuser
-        request.user = self.superuser
-        self.assertTrue(permission.has_permission(request, view))
-        
-        # Test with unauthenticated user
-        request.user = self.anonymous_user
-        self.assertFalse(permission.has_permission(request, view))
+        with self.assertNumQueries(0):
+            # Test with authenticated user
+            request = self.GET
+            request.user = self.polinizador
+            self.assertTrue(permission.has_permission(request, view))
+            
+            # Test with superuser
+            request.user = self.superuser
+            self.assertTrue(permission.has_permission(request, view))
+            
+            # Test with unauthenticated user
+            request.user = self.anonymous_user
+            self.assertFalse(permission.has_permission(request, view))
         
         # Test with user without role
-        user_no_role = User.objects.create_user(username='norole', password='pass123')
+        user_no_role = create_test_user(username='norole')
         request.user = user_no_role
         self.assertFalse(permission.has_permission(request, view))
     
+    def test_role_based_permission_reads_loaded_role(self):
+        """Test that RoleBasedPermission uses the role loaded with the user."""
+        Role.objects.filter(pk=self.germinador_role.pk).update(is_active=False)
+        request = self.GET
+        
+        request.user = User.objects.get(pk=self.polinizador.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(RoleBasedPermission().has_permission(request, STUB_VIEW))
+        
+        request.user = User.objects.get(pk=self.germinador.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(RoleBasedPermission().has_permission(request, STUB_VIEW))
+    
+    def test_role_name_constants_match_choices(self):
+        """Test that the role name constants are the stored choice values."""
+        self.assertEqual(
+            [value for value, label in Role.ROLE_CHOICES],
+            [Role.POLINIZADOR, Role.GERMINADOR, Role.SECRETARIA, Role.ADMINISTRADOR]
+        )
+        self.assertTrue(self.admin.has_role(Role.ADMINISTRADOR))
+    
+    def test_role_based_permission_short_circuits(self):
+        """Test that anonymous and superuser checks never touch the role."""
+        permission = RoleBasedPermission()
+        request = self.GET
+        
+        request.user = SimpleNamespace(is_authenticated=False)
+        self.assertFalse(permission.has_permission(request, STUB_VIEW))
+        
+        request.user = SimpleNamespace(is_authenticated=True, is_superuser=True)
+        self.assertTrue(permission.has_permission(request, STUB_VIEW))
+        
+        request.user = SimpleNamespace(is_authenticated=True, is_superuser=False, role_id=None)
+        self.assertFalse(permission.has_permission(request, STUB_VIEW))
+    
     def test_module_permissions(self):
         """Test module-specific permission classes."""
         # Create a simple view object without required_module attribute
@@ -118,49 +185,79 @@ class PermissionClassesTest(TestCase):
             pass
         
         view = SimpleView()
-        request = self.factory.get('/')
-        
-        # Test PollinationModulePermission
-        permission = PollinationModulePermission()
+        request = self.GET
         
-        request.user = self.polinizador
-        self.assertTrue(permission.has_permission(request, view))
+        with self.assertNumQueries(0):
+            # Test PollinationModulePermission
+            permission = PollinationModulePermission()
+            
+            request.user = self.polinizador
+            self.assertTrue(permission.has_permission(request, view))
+            
+            request.user = self.germinador
+            self.assertFalse(permission.has_permission(request, view))
+            
+            request.user = self.secretaria
+            self.assertTrue(permission.has_permission(request, view))
+            
+            request.user = self.admin
+            self.assertTrue(permission.has_permission(request, view))
+            
+            # Test GerminationModulePermission
+            permission = GerminationModulePermission()
+            
+            request.user = self.polinizador
+            self.assertFalse(permission.has_permission(request, view))
+            
+            request.user = self.germinador
+            self.assertTrue(permission.has_permission(request, view))
+            
+            request.user = self.secretaria
+            self.assertTrue(permission.has_permission(request, view))
+            
+            # Test ReportsModulePermission
+            permission = ReportsModulePermission()
+            
+            request.user = self.polinizador
+            self.assertFalse(permission.has_permission(request, view))
+            
+            request.user = self.admin
+            self.assertTrue(permission.has_permission(request, view))
+    
+    def test_module_permission_resolves_view_module(self):
+        """Test that the view's required module is resolved and remembered."""
+        class GerminationView:
+            required_module = 'germination'
         
+        permission = PollinationModulePermission()
+        request = self.GET
         request.user = self.germinador
-        self.assertFalse(permission.has_permission(request, view))
         
-        request.user = self.secretaria
-        self.assertTrue(permission.has_permission(request, view))
-        
-        request.user = self.admin
-        self.assertTrue(permission.has_permission(request, view))
+        self.assertTrue(permission.has_permission(request, GerminationView()))
+        self.assertEqual(PollinationModulePermission._resolved_modules[GerminationView], 'germination')
+        self.assertNotIn(GerminationView, GerminationModulePermission._resolved_modules)
         
-        # Test GerminationModulePermission
-        permission = GerminationModulePermission()
-        
-        request.user = self.polinizador
+        # A module given to the view instance still wins
+        view = GerminationView()
+        view.required_module = 'pollination'
         self.assertFalse(permission.has_permission(request, view))
+    
+    def test_module_permission_flag_set_at_class_definition(self):
+        """Test that each module permission class carries its module bit."""
+        self.assertEqual(PollinationModulePermission.module_flag, MODULE_POLLINATION)
+        self.assertEqual(AuthenticationModulePermission.module_flag, MODULE_AUTHENTICATION)
+        self.assertIsNone(ModulePermission.module_flag)
         
-        request.user = self.germinador
-        self.assertTrue(permission.has_permission(request, view))
-        
-        request.user = self.secretaria
-        self.assertTrue(permission.has_permission(request, view))
-        
-        # Test ReportsModulePermission
-        permission = ReportsModulePermission()
-        
+        request = self.GET
         request.user = self.polinizador
-        self.assertFalse(permission.has_permission(request, view))
-        
-        request.user = self.admin
-        self.assertTrue(permission.has_permission(request, view))
+        with patch('authentication.permissions.MODULE_FLAGS', {}):
+            self.assertTrue(PollinationModulePermission().has_permission(request, STUB_VIEW))
     
     def test_can_delete_records_permission(self):
         """Test CanDeleteRecordsPermission class."""
         permission = CanDeleteRecordsPermission()
-        view = Mock()
-        request = self.factory.delete('/')
+        view = STUB_VIEW
+        request = self.DELETE
         
         # Only admin can delete
         request.user = self.polinizador
@@ -175,8 +272,8 @@ class PermissionClassesTest(TestCase):
     def test_can_generate_reports_permission(self):
         """Test CanGenerateReportsPermission class."""
         permission = CanGenerateReportsPermission()
-        view = Mock()
-        request = self.factory.get('/')
+        view = STUB_VIEW
+        request = self.GET
         
         # Only admin can generate reports
         request.user = self.secretaria
@@ -185,15 +282,39 @@ class PermissionClassesTest(TestCase):
         request.user = self.admin
         self.assertTrue(permission.has_permission(request, view))
     
+    def test_permission_checks_resolve_role_once(self):
+        """Test that repeated checks on a request user do not query the role again."""
+        user = User.objects.get(pk=self.secretaria.pk)
+        request = self.GET
+        request.user = user
+        view = STUB_VIEW
+        permission_classes = [
+            RoleBasedPermission(),
+            PollinationModulePermission(),
+            ReportsModulePermission(),
+            CanDeleteRecordsPermission(),
+            CanGenerateReportsPermission(),
+        ]
+        results = [permission.has_permission(request, view) for permission in permission_classes]
+        
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                self.assertEqual(
+                    [permission.has_permission(request, view) for permission in permission_classes],
+                    results
+                )
+                self.assertTrue(user.has_role('Secretaria'))
+        
+        self.assertEqual(results, [True, True, False, False, False])
+    
     def test_is_owner_or_admin_permission(self):
         """Test IsOwnerOrAdminPermission class."""
         permission = IsOwnerOrAdminPermission()
-        view = Mock()
-        request = self.factory.get('/')
+        view = STUB_VIEW
+        request = self.GET
         
-        # Create mock object with created_by field
-        obj = Mock()
-        obj.created_by = self.polinizador
+        # Create stub object with created_by field
+        obj = SimpleNamespace(created_by=self.polinizador)
         
         # Owner can access
         request.user = self.polinizador
@@ -206,6 +327,26 @@ class PermissionClassesTest(TestCase):
         # Admin can access
         request.user = self.admin
         self.assertTrue(permission.has_object_permission(request, view, obj))
+    
+    def test_is_owner_or_admin_permission_uses_annotation(self):
+        """Test that the annotated ownership flag is used without loading the owner."""
+        permission = IsOwnerOrAdminPermission()
+        view = STUB_VIEW
+        request = self.GET
+        UserProfile.objects.get_or_create(user=self.polinizador)
+        UserProfile.objects.get_or_create(user=self.germinador)
+        
+        request.user = self.polinizador
+        profiles = annotate_is_owner(UserProfile.objects.order_by('user__username'), request.user)
+        results = {
+            profile.user_id: permission.has_object_permission(request, view, profile)
+            for profile in profiles
+        }
+        
+        self.assertTrue(results[self.polinizador.id])
+        self.assertFalse(results[self.germinador.id])
+        for profile in profiles:
+            self.assertFalse(UserProfile.user.is_cached(profile))
 
 
 class PermissionDecoratorsTest(TestCase):
@@ -213,24 +354,22 @@ class PermissionDecoratorsTest(TestCase):
     Test cases for permission decorators.
     """
     
-    def setUp(self):
+    factory = RequestFactory()
+    
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.factory = RequestFactory()
-        
         # Create roles and users
-        self.admin_role = Role.objects.create(name='Administrador')
-        self.polinizador_role = Role.objects.create(name='Polinizador')
+        cls.admin_role, cls.polinizador_role = create_test_roles(Role.ADMINISTRADOR, Role.POLINIZADOR)
         
-        self.admin = User.objects.create_user(
+        cls.admin = create_test_user(
             username='admin',
-            password='pass123',
-            role=self.admin_role
+            role=cls.admin_role
         )
         
-        self.polinizador = User.objects.create_user(
+        cls.polinizador = create_test_user(
             username='polinizador',
-            password='pass123',
-            role=self.polinizador_role
+            role=cls.polinizador_role
         )
     
     def test_require_role_decorator(self):
@@ -285,24 +424,22 @@ class PermissionMixinsTest(TestCase):
     Test cases for permission mixins.
     """
     
-    def setUp(self):
+    factory = RequestFactory()
+    
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.factory = RequestFactory()
-        
         # Create roles and users
-        self.admin_role = Role.objects.create(name='Administrador')
-        self.polinizador_role = Role.objects.create(name='Polinizador')
+        cls.admin_role, cls.polinizador_role = create_test_roles(Role.ADMINISTRADOR, Role.POLINIZADOR)
         
-        self.admin = User.objects.create_user(
+        cls.admin = create_test_user(
             username='admin',
-            password='pass123',
-            role=self.admin_role
+            role=cls.admin_role
         )
         
-        self.polinizador = User.objects.create_user(
+        cls.polinizador = create_test_user(
             username='polinizador',
-            password='pass123',
-            role=self.polinizador_role
+            role=cls.polinizador_role
         )
     
     def test_role_required_mixin(self):
@@ -393,18 +530,28 @@ class MiddlewareTest(TestCase):
     Test cases for middleware classes.
     """
     
-    def setUp(self):
+    factory = RequestFactory()
+    
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.factory = RequestFactory()
-        
         # Create roles and users
-        self.admin_role = Role.objects.create(name='Administrador')
-        self.admin = User.objects.create_user(
+        cls.admin_role = Role.objects.create(name=Role.ADMINISTRADOR)
+        cls.admin = create_test_user(
             username='admin',
-            password='pass123',
-            role=self.admin_role
+            role=cls.admin_role
         )
     
+    def setUp(self):
+        """Start each test with empty caches."""
+        cache.clear()
+        validated_token_cache.clear()
+    
+    def tearDown(self):
+        """Leave no debounce or token entries behind for other tests."""
+        cache.clear()
+        validated_token_cache.clear()
+    
     def test_security_headers_middleware(self):
         """Test SecurityHeadersMiddleware."""
         middleware = SecurityHeadersMiddleware(lambda request: JsonResponse({}))
@@ -413,10 +560,13 @@ class MiddlewareTest(TestCase):
         response = middleware(request)
         
         # Check security headers
-        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
-        self.assertEqual(response['X-Frame-Options'], 'DENY')
-        self.assertEqual(response['X-XSS-Protection'], '1; mode=block')
-        self.assertEqual(response['Referrer-Policy'], 'strict-origin-when-cross-origin')
+        expected = {
+            'X-Content-Type-Options': 'nosniff',
+            'X-Frame-Options': 'DENY',
+            'X-XSS-Protection': '1; mode=block',
+            'Referrer-Policy': 'strict-origin-when-cross-origin',
+        }
+        self.assertEqual({header: response.get(header) for header in expected}, expected)
     
     def test_user_activity_middleware(self):
         """Test UserActivityMiddleware."""
@@ -435,17 +585,72 @@ class MiddlewareTest(TestCase):
         self.admin.refresh_from_db()
         self.assertNotEqual(self.admin.last_login, original_last_login)
     
-    @patch('authentication.middleware.resolve')
-    def test_role_based_permission_middleware_public_url(self, mock_resolve):
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_user_activity_middleware_debounces_writes(self):
+        """Test that UserActivityMiddleware writes last_login once per interval."""
+        # setUp cleared the cache configured before this override
+        cache.clear()
+        middleware = UserActivityMiddleware(lambda request: JsonResponse({}))
+        
+        request = self.factory.get('/')
+        request.user = self.admin
+        
+        with self.assertNumQueries(1):
+            middleware(request)
+            middleware(request)
+    
+    def test_cached_jwt_authentication_skips_verification_on_hit(self):
+        """Test that a validated token is only verified once while cached."""
+        raw_token = str(RefreshToken.for_user(self.admin).access_token).encode()
+        jwt_auth = CachedJWTAuthentication()
+        
+        with patch.object(Token, 'verify', autospec=True, side_effect=Token.verify) as verify:
+            first = jwt_auth.get_validated_token(raw_token)
+            second = jwt_auth.get_validated_token(raw_token)
+        
+        self.assertEqual(verify.call_count, 1)
+        self.assertIs(first, second)
+    
+    def test_cached_jwt_authentication_drops_expired_tokens(self):
+        """Test that a cached token past its expiry is verified again and rejected."""
+        access_token = RefreshToken.for_user(self.admin).access_token
+        access_token.set_exp(lifetime=timedelta(seconds=-1))
+        raw_token = str(access_token).encode()
+        jwt_auth = CachedJWTAuthentication()
+        validated_token_cache.set(jwt_auth.get_cache_key(raw_token), access_token, access_token['exp'])
+        
+        with self.assertRaises(InvalidToken):
+            jwt_auth.get_validated_token(raw_token)
+        
+        self.assertIsNone(validated_token_cache.get(jwt_auth.get_cache_key(raw_token)))
+    
+    def test_cached_jwt_authentication_never_caches_invalid_tokens(self):
+        """Test that an invalid token is rejected and not cached."""
+        raw_token = b'not.a.token'
+        jwt_auth = CachedJWTAuthentication()
+        
+        with self.assertRaises(InvalidToken):
+            jwt_auth.get_validated_token(raw_token)
+        
+        self.assertIsNone(validated_token_cache.get(jwt_auth.get_cache_key(raw_token)))
+    
+    def test_validated_token_cache_evicts_least_recently_used(self):
+        """Test that the token cache keeps at most maxsize entries."""
+        token_cache = ValidatedTokenCache(maxsize=2)
+        deadline = time.time() + 60
+        token_cache.set(b'a', 'token-a', deadline)
+        token_cache.set(b'b', 'token-b', deadline)
+        token_cache.get(b'a')
+        token_cache.set(b'c', 'token-c', deadline)
+        
+        self.assertEqual(token_cache.get(b'a'), 'token-a')
+        self.assertIsNone(token_cache.get(b'b'))
+        self.assertEqual(token_cache.get(b'c'), 'token-c')
+    
+    def test_role_based_permission_middleware_public_url(self):
         """Test RoleBasedPermissionMiddleware with public URL."""
         middleware = RoleBasedPermissionMiddleware(lambda request: JsonResponse({}))
         
-        # Mock resolve to return login URL
-        mock_resolved = Mock()
-        mock_resolved.namespace = 'authentication'
-        mock_resolved.url_name = 'login'
-        mock_resolve.return_value = mock_resolved
-        
         request = self.factory.post('/api/auth/login/')
         response = middleware(request)
         
@@ -453,6 +658,32 @@ class MiddlewareTest(TestCase):
         # The response we get is from the lambda function, not the middleware
         self.assertEqual(response.status_code, 200)
     
+    @patch('authentication.middleware.resolve')
+    def test_role_based_permission_middleware_skips_non_api_paths(self, mock_resolve):
+        """Test RoleBasedPermissionMiddleware ignores non-API and preflight requests."""
+        middleware = RoleBasedPermissionMiddleware(lambda request: JsonResponse({}))
+        
+        for request in (
+            self.factory.get('/static/app.js'),
+            self.factory.get('/admin/'),
+            self.factory.get('/api'),
+            self.factory.options('/api/pollination/records/'),
+        ):
+            self.assertIsNone(middleware.process_request(request))
+        
+        mock_resolve.assert_not_called()
+    
+    def test_role_based_permission_middleware_caches_url_names(self):
+        """Test that each path is resolved only once."""
+        resolve_url_name.cache_clear()
+        
+        with patch('authentication.middleware.resolve', wraps=resolve) as mock_resolve:
+            self.assertEqual(resolve_url_name('/api/auth/login/'), 'authentication:login')
+            self.assertEqual(resolve_url_name('/api/auth/login/'), 'authentication:login')
+        
+        mock_resolve.assert_called_once()
+        resolve_url_name.cache_clear()
+    
     def test_error_handling_middleware(self):
         """Test ErrorHandlingMiddleware."""
         middleware = ErrorHandlingMiddleware(lambda request: JsonResponse({}))
@@ -472,6 +703,7 @@ class MiddlewareTest(TestCase):
         self.assertEqual(response_data['error']['code'], 'PERMISSION_DENIED')
 
 
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
 class IntegrationTest(APITestCase):
     """
     Integration tests for the complete permissions system.
@@ -479,11 +711,9 @@ class IntegrationTest(APITestCase):
     
     def setUp(self):
         """Set up test data."""
-        self.client = APIClient()
-        
         # Create roles
-        self.polinizador_role = Role.objects.create(name='Polinizador')
-        self.admin_role = Role.objects.create(name='Administrador')
+        self.polinizador_role = Role.objects.create(name=Role.POLINIZADOR)
+        self.admin_role = Role.objects.create(name=Role.ADMINISTRADOR)
         
         # Create users
         self.polinizador = User.objects.create_user(
@@ -500,9 +730,8 @@ class IntegrationTest(APITestCase):
             email='admin@example.com'
         )
     
-    def test_complete_permission_flow(self):
-        """Test complete permission flow from login to resource access."""
-        # Login as polinizador
+    def test_login_flow(self):
+        """Test that a real login yields a token accepted by protected resources."""
         login_data = {
             'username': 'polinizador',
             'password': 'pass123'
@@ -514,6 +743,15 @@ class IntegrationTest(APITestCase):
         access_token = login_response.data['access']
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
         
+        permissions_response = self.client.get('/api/auth/permissions/')
+        self.assertEqual(permissions_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(permissions_response.data['role'], 'Polinizador')
+    
+    def test_complete_permission_flow(self):
+        """Test complete permission flow from login to resource access."""
+        # Authenticate as polinizador (the login itself is covered by test_login_flow)
+        self.client.force_authenticate(user=self.polinizador)
+        
         # Check permissions
         permissions_response = self.client.get('/api/auth/permissions/')
         self.assertEqual(permissions_response.status_code, status.HTTP_200_OK)
@@ -527,17 +765,8 @@ class IntegrationTest(APITestCase):
     
     def test_admin_permissions_flow(self):
         """Test admin permissions flow."""
-        # Login as admin
-        login_data = {
-            'username': 'admin',
-            'password': 'pass123'
-        }
-        login_response = self.client.post('/api/auth/login/', login_data)
-        self.assertEqual(login_response.status_code, status.HTTP_200_OK)
-        
-        # Use access token
-        access_token = login_response.data['access']
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+        # Authenticate as admin (the login itself is covered by test_login_flow)
+        self.client.force_authenticate(user=self.admin)
         
         # Check permissions
         permissions_response = self.client.get('/api/auth/permissions/')
@@ -1,60 +1,83 @@
-from django.test import TestCase
+from django.test import override_settings
+from unittest.mock import patch
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth.hashers import make_password
+from rest_framework.test import APIRequestFactory, APISimpleTestCase, APITestCase
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from .models import Role, UserProfile
-import json
+from .views import CustomTokenObtainPairView, CustomTokenRefreshView, RoleListView
 
 User = get_user_model()
 
+# Fixture passwords are hashed once per process instead of once per user
+TEST_PASSWORD_HASH = make_password('testpass123')
+ADMIN_PASSWORD_HASH = make_password('adminpass123')
+SECRET_PASSWORD_HASH = make_password('secretpass123')
+
+# URLs do not change at runtime, so they are reversed once per module
+LOGIN_URL = reverse('authentication:login')
+TOKEN_URL = reverse('authentication:token_obtain_pair')
+REFRESH_URL = reverse('authentication:token_refresh')
+LOGOUT_URL = reverse('authentication:logout')
+PROFILE_URL = reverse('authentication:user_profile')
+PASSWORD_CHANGE_URL = reverse('authentication:password_change')
+REGISTER_URL = reverse('authentication:user_registration')
+ROLES_URL = reverse('authentication:role_list')
+STATUS_URL = reverse('authentication:auth_status')
+PERMISSIONS_URL = reverse('authentication:user_permissions')
+
+# Views that must reject unauthenticated requests
+PROTECTED_URLS = (
+    PROFILE_URL,
+    PASSWORD_CHANGE_URL,
+    REGISTER_URL,
+    ROLES_URL,
+    STATUS_URL,
+    PERMISSIONS_URL,
+    LOGOUT_URL,
+)
+
 
 class AuthenticationViewsTest(APITestCase):
     """
     Test cases for authentication views.
     """
     
-    def setUp(self):
+    # Builds requests for tests that call a view directly, without middleware
+    factory = APIRequestFactory()
+    
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.client = APIClient()
-        
         # Create roles
-        self.polinizador_role = Role.objects.create(name='Polinizador')
-        self.admin_role = Role.objects.create(name='Administrador')
+        cls.polinizador_role, cls.admin_role = Role.objects.bulk_create([
+            Role(name='Polinizador'),
+            Role(name='Administrador'),
+        ])
         
         # Create test users
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123',
-            first_name='Test',
-            last_name='User',
-            role=self.polinizador_role,
-            employee_id='EMP001'
-        )
-        
-        self.admin_user = User.objects.create_user(
-            username='admin',
-            email='admin@example.com',
-            password='adminpass123',
-            first_name='Admin',
-            last_name='User',
-            role=self.admin_role,
-            employee_id='ADM001'
-        )
-        
-        # URLs
-        self.login_url = reverse('authentication:login')
-        self.token_url = reverse('authentication:token_obtain_pair')
-        self.refresh_url = reverse('authentication:token_refresh')
-        self.logout_url = reverse('authentication:logout')
-        self.profile_url = reverse('authentication:user_profile')
-        self.password_change_url = reverse('authentication:password_change')
-        self.register_url = reverse('authentication:user_registration')
-        self.roles_url = reverse('authentication:role_list')
-        self.status_url = reverse('authentication:auth_status')
-        self.permissions_url = reverse('authentication:user_permissions')
+        cls.user, cls.admin_user = User.objects.bulk_create([
+            User(
+                username='testuser',
+                email='test@example.com',
+                password=TEST_PASSWORD_HASH,
+                first_name='Test',
+                last_name='User',
+                role=cls.polinizador_role,
+                employee_id='EMP001'
+            ),
+            User(
+                username='admin',
+                email='admin@example.com',
+                password=ADMIN_PASSWORD_HASH,
+                first_name='Admin',
+                last_name='User',
+                role=cls.admin_role,
+                employee_id='ADM001'
+            ),
+        ])
     
     def test_login_view_success(self):
         """Test successful login."""
@@ -62,7 +85,7 @@ class AuthenticationViewsTest(APITestCase):
             'username': 'testuser',
             'password': 'testpass123'
         }
-        response = self.client.post(self.login_url, data)
+        response = self.client.post(LOGIN_URL, data)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('access', response.data)
@@ -76,21 +99,20 @@ class AuthenticationViewsTest(APITestCase):
             'username': 'testuser',
             'password': 'wrongpassword'
         }
-        response = self.client.post(self.login_url, data)
+        response = self.client.post(LOGIN_URL, data)
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('non_field_errors', response.data)
     
     def test_login_view_inactive_user(self):
         """Test login with inactive user."""
-        self.user.is_active = False
-        self.user.save()
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
         
         data = {
             'username': 'testuser',
             'password': 'testpass123'
         }
-        response = self.client.post(self.login_url, data)
+        response = self.client.post(LOGIN_URL, data)
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
     
@@ -100,50 +122,80 @@ class AuthenticationViewsTest(APITestCase):
             'username': 'testuser',
             'password': 'testpass123'
         }
-        response = self.client.post(self.token_url, data)
+        request = self.factory.post(TOKEN_URL, data)
+        response = CustomTokenObtainPairView.as_view()(request)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('access', response.data)
         self.assertIn('refresh', response.data)
         self.assertIn('user', response.data)
     
+    def test_token_obtain_pair_view_user_from_claims(self):
+        """Test that login can return only the user fields embedded as claims."""
+        data = {
+            'username': 'testuser',
+            'password': 'testpass123'
+        }
+        response = self.client.post(f'{TOKEN_URL}?user=claims', data)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user'], {
+            'id': self.user.id,
+            'username': 'testuser',
+            'email': self.user.email,
+            'role': 'Polinizador',
+            'employee_id': self.user.employee_id
+        })
+    
     def test_token_refresh_view(self):
         """Test JWT token refresh view."""
         # First get tokens
         refresh = RefreshToken.for_user(self.user)
         
         data = {'refresh': str(refresh)}
-        response = self.client.post(self.refresh_url, data)
+        request = self.factory.post(REFRESH_URL, data)
+        response = CustomTokenRefreshView.as_view()(request)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('access', response.data)
         self.assertIn('user', response.data)
     
+    def test_token_refresh_view_user_from_claims(self):
+        """Test that token refresh can return the user data from the claims."""
+        from authentication.serializers import CustomTokenObtainPairSerializer
+        
+        refresh = CustomTokenObtainPairSerializer.get_token(self.user)
+        
+        data = {'refresh': str(refresh)}
+        # Only the blacklist check hits the database
+        with self.assertNumQueries(1):
+            response = self.client.post(f'{REFRESH_URL}?user=claims', data)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user'], {
+            'id': self.user.id,
+            'username': 'testuser',
+            'email': self.user.email,
+            'role': 'Polinizador',
+            'employee_id': self.user.employee_id
+        })
+    
     def test_logout_view_success(self):
         """Test successful logout."""
         refresh = RefreshToken.for_user(self.user)
         self.client.force_authenticate(user=self.user)
         
         data = {'refresh': str(refresh)}
-        response = self.client.post(self.logout_url, data)
+        response = self.client.post(LOGOUT_URL, data)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('message', response.data)
     
-    def test_logout_view_without_token(self):
-        """Test logout without refresh token."""
-        self.client.force_authenticate(user=self.user)
-        
-        response = self.client.post(self.logout_url, {})
-        
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('error', response.data)
-    
     def test_user_profile_view_get(self):
         """Test getting user profile."""
         self.client.force_authenticate(user=self.user)
         
-        response = self.client.get(self.profile_url)
+        response = self.client.get(PROFILE_URL)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['username'], 'testuser')
@@ -158,7 +210,7 @@ class AuthenticationViewsTest(APITestCase):
             'last_name': 'Name',
             'phone_number': '+1234567890'
         }
-        response = self.client.patch(self.profile_url, data)
+        response = self.client.patch(PROFILE_URL, data)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['first_name'], 'Updated')
@@ -174,7 +226,7 @@ class AuthenticationViewsTest(APITestCase):
             'new_password': 'newpass123',
             'new_password_confirm': 'newpass123'
         }
-        response = self.client.post(self.password_change_url, data)
+        response = self.client.post(PASSWORD_CHANGE_URL, data)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('message', response.data)
@@ -192,7 +244,7 @@ class AuthenticationViewsTest(APITestCase):
             'new_password': 'newpass123',
             'new_password_confirm': 'newpass123'
         }
-        response = self.client.post(self.password_change_url, data)
+        response = self.client.post(PASSWORD_CHANGE_URL, data)
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('old_password', response.data)
@@ -206,7 +258,7 @@ class AuthenticationViewsTest(APITestCase):
             'new_password': 'newpass123',
             'new_password_confirm': 'differentpass123'
         }
-        response = self.client.post(self.password_change_url, data)
+        response = self.client.post(PASSWORD_CHANGE_URL, data)
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('non_field_errors', response.data)
@@ -224,7 +276,7 @@ class AuthenticationViewsTest(APITestCase):
             'password_confirm': 'newpass123',
             'employee_id': 'EMP002'
         }
-        response = self.client.post(self.register_url, data)
+        response = self.client.post(REGISTER_URL, data)
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data['username'], 'newuser')
@@ -243,7 +295,7 @@ class AuthenticationViewsTest(APITestCase):
             'password': 'newpass123',
             'password_confirm': 'newpass123'
         }
-        response = self.client.post(self.register_url, data)
+        response = self.client.post(REGISTER_URL, data)
         
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
     
@@ -251,7 +303,7 @@ class AuthenticationViewsTest(APITestCase):
         """Test role list view."""
         self.client.force_authenticate(user=self.user)
         
-        response = self.client.get(self.roles_url)
+        response = self.client.get(ROLES_URL)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Check if response has results (paginated) or is a direct list
@@ -265,27 +317,81 @@ class AuthenticationViewsTest(APITestCase):
         self.assertIn('Polinizador', role_names)
         self.assertIn('Administrador', role_names)
     
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_role_list_view_caches_roles(self):
+        """Test that the active roles are read once until a role changes."""
+        self.client.force_authenticate(user=self.user)
+        
+        self.client.get(ROLES_URL)
+        with self.assertNumQueries(0):
+            response = self.client.get(ROLES_URL)
+        
+        self.assertEqual(response.data['count'], 2)
+        
+        Role.objects.create(name=Role.GERMINADOR)
+        response = self.client.get(ROLES_URL)
+        
+        self.assertEqual(response.data['count'], 3)
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_role_list_view_follows_bulk_role_writes(self):
+        """Test that bulk role writes, which send no signals, refresh the cached roles."""
+        self.client.force_authenticate(user=self.user)
+        
+        self.client.get(ROLES_URL)
+        Role.objects.bulk_create([Role(name=Role.GERMINADOR), Role(name=Role.SECRETARIA)])
+        response = self.client.get(ROLES_URL)
+        
+        self.assertEqual(response.data['count'], 4)
+        
+        Role.objects.filter(name=Role.SECRETARIA).update(is_active=False)
+        response = self.client.get(ROLES_URL)
+        
+        self.assertEqual(response.data['count'], 3)
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_role_list_view_filter_params_bypass_cache(self):
+        """Test that a request with filter parameters is not served from the cache."""
+        self.client.force_authenticate(user=self.user)
+        
+        self.client.get(ROLES_URL)
+        with patch.object(RoleListView, 'filter_queryset', autospec=True,
+                          side_effect=lambda view, queryset: queryset.none()):
+            response = self.client.get(ROLES_URL, {'search': 'Admin'})
+        
+        self.assertEqual(response.data['count'], 0)
+    
     def test_auth_status_view(self):
         """Test authentication status view."""
         self.client.force_authenticate(user=self.user)
         
-        response = self.client.get(self.status_url)
+        response = self.client.get(STATUS_URL)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['authenticated'])
         self.assertEqual(response.data['user']['username'], 'testuser')
     
-    def test_auth_status_view_unauthenticated(self):
-        """Test authentication status view without authentication."""
-        response = self.client.get(self.status_url)
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_auth_status_view_caches_user_data(self):
+        """Test that auth status serializes the user once until it changes."""
+        self.client.force_authenticate(user=self.user)
         
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.get(STATUS_URL)
+        with self.assertNumQueries(0):
+            response = self.client.get(STATUS_URL)
+        
+        self.assertEqual(response.data['user']['username'], 'testuser')
+        
+        UserProfile.objects.create(user=self.user, department='Laboratorio')
+        response = self.client.get(STATUS_URL)
+        
+        self.assertEqual(response.data['user']['profile']['department'], 'Laboratorio')
     
     def test_user_permissions_view(self):
         """Test user permissions view."""
         self.client.force_authenticate(user=self.user)
         
-        response = self.client.get(self.permissions_url)
+        response = self.client.get(PERMISSIONS_URL)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['role'], 'Polinizador')
@@ -294,11 +400,20 @@ class AuthenticationViewsTest(APITestCase):
         self.assertFalse(response.data['can_delete_records'])
         self.assertFalse(response.data['can_generate_reports'])
     
+    def test_user_permissions_view_runs_no_queries(self):
+        """Test that the permissions view reads only the loaded user and role."""
+        self.client.force_authenticate(user=self.user)
+        
+        with self.assertNumQueries(0):
+            response = self.client.get(PERMISSIONS_URL)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
     def test_user_permissions_view_admin(self):
         """Test user permissions view for admin."""
         self.client.force_authenticate(user=self.admin_user)
         
-        response = self.client.get(self.permissions_url)
+        response = self.client.get(PERMISSIONS_URL)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['role'], 'Administrador')
@@ -309,23 +424,10 @@ class AuthenticationViewsTest(APITestCase):
     
     def test_unauthenticated_access_to_protected_views(self):
         """Test that protected views require authentication."""
-        protected_urls = [
-            self.profile_url,
-            self.password_change_url,
-            self.register_url,
-            self.roles_url,
-            self.status_url,
-            self.permissions_url,
-            self.logout_url
-        ]
-        
-        for url in protected_urls:
-            response = self.client.get(url)
-            self.assertEqual(
-                response.status_code, 
-                status.HTTP_401_UNAUTHORIZED,
-                f"URL {url} should require authentication"
-            )
+        for url in PROTECTED_URLS:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
 class JWTTokenTest(APITestCase):
@@ -336,10 +438,10 @@ class JWTTokenTest(APITestCase):
     def setUp(self):
         """Set up test data."""
         self.role = Role.objects.create(name='Polinizador')
-        self.user = User.objects.create_user(
+        self.user = User.objects.create(
             username='testuser',
             email='test@example.com',
-            password='testpass123',
+            password=TEST_PASSWORD_HASH,
             role=self.role,
             employee_id='EMP001'
         )
@@ -366,15 +468,36 @@ class JWTTokenTest(APITestCase):
         # Use token to authenticate
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
         
-        response = self.client.get(reverse('authentication:auth_status'))
+        response = self.client.get(STATUS_URL)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['user']['username'], 'testuser')
+
+
+class NegativeAuthTest(APISimpleTestCase):
+    """
+    Test requests that are rejected before the database is used.
+    """
+    
+    def test_logout_view_without_token(self):
+        """Test logout without refresh token."""
+        self.client.force_authenticate(user=User(username='testuser'))
+        
+        response = self.client.post(LOGOUT_URL, {})
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+    
+    def test_auth_status_view_unauthenticated(self):
+        """Test authentication status view without authentication."""
+        response = self.client.get(STATUS_URL)
+        
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
     
     def test_invalid_jwt_token(self):
         """Test authentication with invalid JWT token."""
         self.client.credentials(HTTP_AUTHORIZATION='Bearer invalid_token')
         
-        response = self.client.get(reverse('authentication:auth_status'))
+        response = self.client.get(STATUS_URL)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
@@ -386,10 +509,10 @@ class UserProfileIntegrationTest(APITestCase):
     def setUp(self):
         """Set up test data."""
         self.role = Role.objects.create(name='Secretaria')
-        self.user = User.objects.create_user(
+        self.user = User.objects.create(
             username='secretary',
             email='secretary@example.com',
-            password='secretpass123',
+            password=SECRET_PASSWORD_HASH,
             first_name='Maria',
             last_name='Garcia',
             role=self.role,
@@ -408,34 +531,37 @@ class UserProfileIntegrationTest(APITestCase):
         """Test that user profile is included in user data."""
         self.client.force_authenticate(user=self.user)
         
-        response = self.client.get(reverse('authentication:user_profile'))
+        response = self.client.get(PROFILE_URL)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('profile', response.data)
         self.assertEqual(response.data['profile']['department'], 'Administración')
         self.assertEqual(response.data['profile']['position'], 'Secretaria Ejecutiva')
     
-    def test_complete_authentication_flow(self):
-        """Test complete authentication flow with profile."""
-        # Login
+    def test_login_flow(self):
+        """Test that login returns tokens for the user."""
         login_data = {
             'username': 'secretary',
             'password': 'secretpass123'
         }
         login_response = self.client.post(
-            reverse('authentication:login'), 
+            LOGIN_URL, 
             login_data
         )
         
         self.assertEqual(login_response.status_code, status.HTTP_200_OK)
-        
-        # Use access token
-        access_token = login_response.data['access']
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+        self.assertIn('access', login_response.data)
+        self.assertIn('refresh', login_response.data)
+    
+    def test_complete_authentication_flow(self):
+        """Test complete authentication flow with profile."""
+        # Issue tokens directly; test_login_flow covers the login endpoint
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
         
         # Check permissions
         permissions_response = self.client.get(
-            reverse('authentication:user_permissions')
+            PERMISSIONS_URL
         )
         
         self.assertEqual(permissions_response.status_code, status.HTTP_200_OK)
@@ -446,10 +572,9 @@ class UserProfileIntegrationTest(APITestCase):
         self.assertFalse(permissions_response.data['modules']['reports'])
         
         # Logout
-        refresh_token = login_response.data['refresh']
         logout_response = self.client.post(
-            reverse('authentication:logout'),
-            {'refresh': refresh_token}
+            LOGOUT_URL,
+            {'refresh': str(refresh)}
         )
         
         self.assertEqual(logout_response.status_code, status.HTTP_200_OK)
\ No newline at end of file
@@ -1,9 +1,16 @@
-from django.test import TestCase
+from django.conf import settings
+from django.core import serializers
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ValidationError
 from django.db import IntegrityError
-from .models import Role, UserProfile
-import json
+from .models import (
+    Role, UserProfile,
+    CAN_CREATE, CAN_READ, CAN_UPDATE, CAN_DELETE, CAN_GENERATE_REPORTS,
+    MODULE_POLLINATION, MODULE_GERMINATION, MODULE_ALERTS, MODULE_REPORTS,
+    MODULE_AUTHENTICATION
+)
+from .serializers import UserSerializer
 
 
 User = get_user_model()
@@ -14,12 +21,10 @@ class RoleModelTest(TestCase):
     Test cases for Role model.
     """
     
-    def setUp(self):
-        """Set up test data."""
-        self.role_data = {
-            'name': 'Polinizador',
-            'description': 'Usuario encargado de procesos de polinización'
-        }
+    role_data = {
+        'name': 'Polinizador',
+        'description': 'Usuario encargado de procesos de polinización'
+    }
     
     def test_create_role(self):
         """Test creating a role with valid data."""
@@ -64,6 +69,113 @@ class RoleModelTest(TestCase):
         )
         self.assertEqual(role.permissions, custom_permissions)
     
+    def test_saved_permissions_do_not_share_default_template(self):
+        """Test that modifying a role's permissions leaves the defaults intact."""
+        role = Role.objects.create(name='Polinizador')
+        role.permissions['modules'].append('reports')
+        
+        self.assertEqual(Role(name='Polinizador').get_default_permissions()['modules'], ['pollination'])
+    
+    def test_permission_flags_follow_permissions(self):
+        """Test that the permission bitmask is computed from the JSON permissions."""
+        role = Role.objects.create(name='Administrador')
+        self.assertEqual(
+            role.permission_flags,
+            CAN_CREATE | CAN_READ | CAN_UPDATE | CAN_DELETE | CAN_GENERATE_REPORTS
+            | MODULE_POLLINATION | MODULE_GERMINATION | MODULE_ALERTS
+            | MODULE_REPORTS | MODULE_AUTHENTICATION
+        )
+        
+        role.permissions = dict(role.permissions, can_delete=False)
+        role.save(update_fields=['permissions'])
+        role.refresh_from_db()
+        self.assertFalse(role.permission_flags & CAN_DELETE)
+        self.assertTrue(role.permission_flags & CAN_GENERATE_REPORTS)
+    
+    def test_bulk_create_sets_default_permissions(self):
+        """Test that bulk-created roles get the same defaults as saved roles."""
+        roles = Role.objects.bulk_create([Role(name='Polinizador'), Role(name='Administrador')])
+        
+        for role in roles:
+            saved = Role(name=role.name)
+            saved.prepare_permissions()
+            self.assertEqual(role.permissions, saved.permissions)
+            self.assertEqual(role.permission_flags, saved.permission_flags)
+        self.assertEqual(Role.objects.get(name='Polinizador').permissions['modules'], ['pollination'])
+    
+    def test_queryset_update_recomputes_permission_flags(self):
+        """Test that updating permissions through a queryset updates the bitmask."""
+        role = Role.objects.create(name='Polinizador')
+        
+        Role.objects.filter(pk=role.pk).update(permissions={'modules': ['reports'], 'can_delete': True})
+        role.refresh_from_db()
+        self.assertEqual(role.permission_flags, CAN_DELETE | MODULE_REPORTS)
+    
+    def test_bulk_update_recomputes_permission_flags(self):
+        """Test that bulk-updating permissions updates the bitmask."""
+        role = Role.objects.create(name='Polinizador')
+        
+        role.permissions = {'modules': ['alerts'], 'can_read': True}
+        Role.objects.bulk_update([role], ['permissions'])
+        role.refresh_from_db()
+        self.assertEqual(role.permission_flags, CAN_READ | MODULE_ALERTS)
+    
+    def test_raw_save_computes_permission_flags(self):
+        """Test that roles deserialized without a bitmask get one on a raw save."""
+        data = '[{"model": "authentication.role", "pk": 99, "fields": {"name": "Germinador", ' \
+               '"permissions": {"modules": ["germination"], "can_read": true}, ' \
+               '"created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z"}}]'
+        for obj in serializers.deserialize('json', data):
+            obj.save()
+        
+        role = Role.objects.get(pk=99)
+        self.assertEqual(role.permission_flags, CAN_READ | MODULE_GERMINATION)
+    
+    def test_permission_flags_include_modules(self):
+        """Test that only the role's modules get a module bit."""
+        role = Role.objects.create(name='Germinador')
+        self.assertTrue(role.permission_flags & MODULE_GERMINATION)
+        self.assertFalse(role.permission_flags & MODULE_POLLINATION)
+        self.assertFalse(role.permission_flags & MODULE_REPORTS)
+
+
+class RoleFixtureTest(TestCase):
+    """
+    Test cases for roles loaded from the initial fixture.
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Load the initial fixture."""
+        call_command('loaddata', settings.BASE_DIR / 'fixtures' / 'initial_data.json', verbosity=0)
+    
+    def test_fixture_roles_have_permission_flags(self):
+        """Test that every fixture role's bitmask matches its permissions."""
+        for role in Role.objects.all():
+            expected = Role(name=role.name, permissions=role.permissions)
+            expected.prepare_permissions()
+            self.assertEqual(role.permission_flags, expected.permission_flags, role.name)
+    
+    def test_fixture_role_permissions(self):
+        """Test the permission checks of users with fixture roles."""
+        polinizador = User(username='polinizador', role=Role.objects.get(name='Polinizador'))
+        self.assertTrue(polinizador.has_module_permission('pollination'))
+        self.assertFalse(polinizador.has_module_permission('reports'))
+        self.assertFalse(polinizador.can_delete_records())
+        self.assertFalse(polinizador.can_generate_reports())
+        
+        admin = User(username='administrador', role=Role.objects.get(name='Administrador'))
+        self.assertTrue(admin.has_module_permission('reports'))
+        self.assertTrue(admin.has_module_permission('authentication'))
+        self.assertTrue(admin.can_delete_records())
+        self.assertTrue(admin.can_generate_reports())
+
+
+class RolePermissionsLogicTest(SimpleTestCase):
+    """
+    Test cases for role permission defaults, on unsaved roles.
+    """
+    
     def test_get_default_permissions_for_all_roles(self):
         """Test default permissions for all role types."""
         role_types = ['Polinizador', 'Germinador', 'Secretaria', 'Administrador']
@@ -80,14 +192,16 @@ class RoleModelTest(TestCase):
     
     def test_administrador_permissions(self):
         """Test that Administrador role has full permissions."""
-        role = Role.objects.create(name='Administrador')
+        role = Role(name='Administrador')
+        role.prepare_permissions()
         self.assertTrue(role.permissions['can_delete'])
         self.assertTrue(role.permissions['can_generate_reports'])
         self.assertIn('reports', role.permissions['modules'])
     
     def test_polinizador_permissions(self):
         """Test that Polinizador role has limited permissions."""
-        role = Role.objects.create(name='Polinizador')
+        role = Role(name='Polinizador')
+        role.prepare_permissions()
         self.assertFalse(role.permissions['can_delete'])
         self.assertFalse(role.permissions['can_generate_reports'])
         self.assertEqual(role.permissions['modules'], ['pollination'])
@@ -98,10 +212,19 @@ class CustomUserModelTest(TestCase):
     Test cases for CustomUser model.
     """
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.role = Role.objects.create(name='Polinizador')
-        self.user_data = {
+        cls.role, cls.admin_role = Role.objects.bulk_create([
+            Role(name='Polinizador'),
+            Role(name='Administrador'),
+        ])
+        cls.admin_user, cls.role_user, cls.no_role_user = User.objects.bulk_create([
+            User(username='roleadmin', email='roleadmin@example.com', role=cls.admin_role),
+            User(username='roleuser', email='roleuser@example.com', role=cls.role),
+            User(username='noroleuser', email='noroleuser@example.com'),
+        ])
+        cls.user_data = {
             'username': 'testuser',
             'email': 'test@example.com',
             'first_name': 'Test',
@@ -131,7 +254,21 @@ class CustomUserModelTest(TestCase):
         """Test creating user with role."""
         user = User.objects.create_user(role=self.role, **self.user_data)
         self.assertEqual(user.role, self.role)
-        self.assertEqual(user.get_role_name(), 'Polinizador')
+        
+        user = User.objects.get(pk=user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(user.get_role_name(), 'Polinizador')
+    
+    def test_user_role_loaded_with_user(self):
+        """Test that fetching a user also loads its role."""
+        user = User.objects.create_user(role=self.role, **self.user_data)
+        with self.assertNumQueries(1):
+            fetched_user = User.objects.get(pk=user.pk)
+            self.assertEqual(fetched_user.role.name, 'Polinizador')
+        self.assertEqual(
+            fetched_user.role.get_deferred_fields(),
+            {'created_at', 'updated_at'}
+        )
     
     def test_user_unique_employee_id(self):
         """Test that employee IDs must be unique."""
@@ -143,17 +280,44 @@ class CustomUserModelTest(TestCase):
                 employee_id='EMP001'
             )
     
-    def test_user_has_role_method(self):
-        """Test has_role method."""
-        user = User.objects.create_user(role=self.role, **self.user_data)
-        self.assertTrue(user.has_role('Polinizador'))
-        self.assertFalse(user.has_role('Administrador'))
-    
-    def test_user_has_module_permission(self):
-        """Test has_module_permission method."""
+    def test_user_role_and_permission_methods(self):
+        """Test role and permission methods on users with and without a role."""
+        user = self.role_user
+        with self.subTest('has_role'):
+            self.assertTrue(user.has_role('Polinizador'))
+            self.assertFalse(user.has_role('Administrador'))
+        
+        with self.subTest('has_module_permission'):
+            self.assertTrue(user.has_module_permission('pollination'))
+            self.assertFalse(user.has_module_permission('reports'))
+        
+        with self.subTest('can_delete_records'):
+            self.assertFalse(user.can_delete_records())
+            self.assertTrue(self.admin_user.can_delete_records())
+        
+        with self.subTest('can_generate_reports'):
+            self.assertFalse(user.can_generate_reports())
+            self.assertTrue(self.admin_user.can_generate_reports())
+        
+        with self.subTest('without_role'):
+            user = self.no_role_user
+            self.assertIsNone(user.get_role_name())
+            self.assertFalse(user.has_role('any_role'))
+            self.assertFalse(user.has_module_permission('any_module'))
+            self.assertFalse(user.can_delete_records())
+            self.assertFalse(user.can_generate_reports())
+    
+    def test_user_permissions_follow_role_change(self):
+        """Test that permission checks follow a role assigned but not yet saved."""
         user = User.objects.create_user(role=self.role, **self.user_data)
-        self.assertTrue(user.has_module_permission('pollination'))
-        self.assertFalse(user.has_module_permission('reports'))
+        self.assertFalse(user.can_generate_reports())
+        
+        user.role = self.admin_role
+        self.assertTrue(user.can_generate_reports())
+        self.assertTrue(user.has_module_permission('reports'))
+        
+        user.role = None
+        self.assertFalse(user.has_module_permission('pollination'))
     
     def test_superuser_permissions(self):
         """Test that superuser has all permissions."""
@@ -166,57 +330,24 @@ class CustomUserModelTest(TestCase):
         self.assertTrue(user.can_delete_records())
         self.assertTrue(user.can_generate_reports())
     
-    def test_user_can_delete_records(self):
-        """Test can_delete_records method."""
-        # Regular user cannot delete
-        user = User.objects.create_user(role=self.role, **self.user_data)
-        self.assertFalse(user.can_delete_records())
-        
-        # Admin can delete
-        admin_role = Role.objects.create(name='Administrador')
-        admin_user = User.objects.create_user(
-            username='admin',
-            email='admin@example.com',
-            role=admin_role
-        )
-        self.assertTrue(admin_user.can_delete_records())
-    
-    def test_user_can_generate_reports(self):
-        """Test can_generate_reports method."""
-        # Regular user cannot generate reports
-        user = User.objects.create_user(role=self.role, **self.user_data)
-        self.assertFalse(user.can_generate_reports())
-        
-        # Admin can generate reports
-        admin_role = Role.objects.create(name='Administrador')
-        admin_user = User.objects.create_user(
-            username='admin',
-            email='admin@example.com',
-            role=admin_role
-        )
-        self.assertTrue(admin_user.can_generate_reports())
-    
     def test_phone_number_validation(self):
         """Test phone number validation."""
         # Valid phone numbers
         valid_phones = ['+1234567890', '1234567890', '+123456789012345']
-        for i, phone in enumerate(valid_phones):
-            user_data = self.user_data.copy()
-            user_data['phone_number'] = phone
-            user_data['username'] = f'user_phone_{i}'
-            user_data['email'] = f'user_phone_{i}@example.com'
-            user_data['employee_id'] = f'EMP_PHONE_{i}'
-            user = User.objects.create_user(**user_data)
-            self.assertEqual(user.phone_number, phone)
-    
-    def test_user_without_role(self):
-        """Test user behavior without assigned role."""
-        user = User.objects.create_user(**self.user_data)
-        self.assertIsNone(user.get_role_name())
-        self.assertFalse(user.has_role('any_role'))
-        self.assertFalse(user.has_module_permission('any_module'))
-        self.assertFalse(user.can_delete_records())
-        self.assertFalse(user.can_generate_reports())
+        User.objects.bulk_create([
+            User(**dict(
+                self.user_data,
+                phone_number=phone,
+                username=f'user_phone_{i}',
+                email=f'user_phone_{i}@example.com',
+                employee_id=f'EMP_PHONE_{i}'
+            ))
+            for i, phone in enumerate(valid_phones)
+        ])
+        stored_phones = User.objects.filter(
+            username__startswith='user_phone_'
+        ).order_by('username').values_list('phone_number', flat=True)
+        self.assertEqual(list(stored_phones), valid_phones)
 
 
 class UserProfileModelTest(TestCase):
@@ -224,16 +355,17 @@ class UserProfileModelTest(TestCase):
     Test cases for UserProfile model.
     """
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             first_name='Test',
             last_name='User'
         )
-        self.profile_data = {
-            'user': self.user,
+        cls.profile_data = {
+            'user': cls.user,
             'department': 'Investigación',
             'position': 'Técnico en Polinización',
             'bio': 'Especialista en procesos de polinización',
@@ -297,17 +429,19 @@ class UserProfileModelTest(TestCase):
     def test_emergency_contact_phone_validation(self):
         """Test emergency contact phone validation."""
         valid_phones = ['+1234567890', '1234567890']
-        for i, phone in enumerate(valid_phones):
-            profile_data = self.profile_data.copy()
-            profile_data['emergency_contact_phone'] = phone
-            # Create new user for each test to avoid unique constraint issues
-            user = User.objects.create_user(
-                username=f'user_emergency_{i}',
-                email=f'user_emergency_{i}@example.com'
-            )
-            profile_data['user'] = user
-            profile = UserProfile.objects.create(**profile_data)
-            self.assertEqual(profile.emergency_contact_phone, phone)
+        # Create new users to avoid unique constraint issues
+        users = User.objects.bulk_create([
+            User(username=f'user_emergency_{i}', email=f'user_emergency_{i}@example.com')
+            for i in range(len(valid_phones))
+        ])
+        UserProfile.objects.bulk_create([
+            UserProfile(**dict(self.profile_data, user=user, emergency_contact_phone=phone))
+            for user, phone in zip(users, valid_phones)
+        ])
+        stored_phones = UserProfile.objects.filter(
+            user__username__startswith='user_emergency_'
+        ).order_by('user__username').values_list('emergency_contact_phone', flat=True)
+        self.assertEqual(list(stored_phones), valid_phones)
     
     def test_profile_cascade_delete(self):
         """Test that profile is deleted when user is deleted."""
@@ -322,6 +456,73 @@ class UserProfileModelTest(TestCase):
             UserProfile.objects.get(id=profile_id)
 
 
+class UserSerializerTest(TestCase):
+    """
+    Test cases for UserSerializer.
+    """
+    
+    def setUp(self):
+        """Set up test data."""
+        self.role = Role.objects.create(name='Germinador')
+        self.user_data = {
+            'username': 'newuser',
+            'email': 'new@example.com',
+            'password': 'newpass12345',
+            'password_confirm': 'newpass12345',
+            'role_id': self.role.id
+        }
+    
+    def test_create_user_with_role(self):
+        """Test that the role is stored with the user in a single INSERT."""
+        serializer = UserSerializer(data=self.user_data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        
+        with self.assertNumQueries(1):
+            user = serializer.save()
+        
+        user.refresh_from_db()
+        self.assertEqual(user.role, self.role)
+        self.assertTrue(user.check_password('newpass12345'))
+    
+    def test_inactive_role_is_rejected(self):
+        """Test that an inactive role cannot be assigned."""
+        self.role.is_active = False
+        self.role.save()
+        
+        serializer = UserSerializer(data=self.user_data)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('role_id', serializer.errors)
+    
+    def test_eager_loading_serializes_users_in_one_query(self):
+        """Test that roles and profiles are loaded with the user list."""
+        for i in range(3):
+            user = User.objects.create_user(
+                username=f'user{i}',
+                email=f'user{i}@example.com',
+                password='testpass123',
+                role=self.role
+            )
+            UserProfile.objects.get_or_create(user=user)
+        
+        with self.assertNumQueries(1):
+            queryset = UserSerializer.setup_eager_loading(User.objects.all())
+            data = UserSerializer(queryset, many=True).data
+        
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data[0]['role']['name'], self.role.name)
+        self.assertIsNotNone(data[0]['profile'])
+    
+    def test_fields_are_not_shared_between_serializers(self):
+        """Test that the cached field template gives each serializer its own fields."""
+        first = UserSerializer().fields
+        second = UserSerializer().fields
+        
+        self.assertEqual(list(first), list(second))
+        self.assertIsNot(first['username'], second['username'])
+        self.assertIsNot(first['role'], second['role'])
+        self.assertIsNone(UserSerializer._fields_template['username'].parent)
+
+
 class ModelIntegrationTest(TestCase):
     """
     Integration tests for authentication models.
@@ -355,15 +556,17 @@ class ModelIntegrationTest(TestCase):
             preferences={'theme': 'light', 'language': 'es'}
         )
         
-        # Test relationships and methods
-        self.assertEqual(user.role.name, 'Secretaria')
-        self.assertTrue(user.has_role('Secretaria'))
-        self.assertTrue(user.has_module_permission('pollination'))
-        self.assertTrue(user.has_module_permission('germination'))
-        self.assertFalse(user.can_generate_reports())
-        
-        self.assertEqual(user.profile, profile)
-        self.assertIn('Secretaria Ejecutiva', profile.get_full_profile_name())
+        # Test relationships and methods on a user loaded with one query
+        user = User.objects.select_related('role', 'profile').get(pk=user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(user.role.name, 'Secretaria')
+            self.assertTrue(user.has_role('Secretaria'))
+            self.assertTrue(user.has_module_permission('pollination'))
+            self.assertTrue(user.has_module_permission('germination'))
+            self.assertFalse(user.can_generate_reports())
+            
+            self.assertEqual(user.profile, profile)
+            self.assertIn('Secretaria Ejecutiva', user.profile.get_full_profile_name())
     
     def test_role_permissions_inheritance(self):
         """Test that users inherit permissions from their roles."""
@@ -374,24 +577,38 @@ class ModelIntegrationTest(TestCase):
             ('Administrador', ['pollination', 'germination', 'alerts', 'reports', 'authentication'])
         ]
         
-        for role_name, expected_modules in roles_and_modules:
-            role = Role.objects.create(name=role_name)
-            user = User.objects.create_user(
-                username=f'user_{role_name.lower()}',
-                email=f'{role_name.lower()}@example.com',
+        roles = Role.objects.bulk_create([Role(name=role_name) for role_name, _ in roles_and_modules])
+        User.objects.bulk_create([
+            User(
+                username=f'user_{role.name.lower()}',
+                email=f'{role.name.lower()}@example.com',
                 role=role
             )
-            
-            for module in expected_modules:
-                self.assertTrue(
-                    user.has_module_permission(module),
-                    f"User with role {role_name} should have access to {module}"
-                )
-            
-            # Test admin-specific permissions
-            if role_name == 'Administrador':
-                self.assertTrue(user.can_delete_records())
-                self.assertTrue(user.can_generate_reports())
-            else:
-                self.assertFalse(user.can_delete_records())
-                self.assertFalse(user.can_generate_reports())
+            for role in roles
+        ])
+        
+        # One query loads every user with the role columns the checks read,
+        # keyed by username
+        users = User.objects.select_related('role').only(
+            'username', 'is_superuser', 'role__permission_flags'
+        ).in_bulk(
+            [f'user_{role_name.lower()}' for role_name, _ in roles_and_modules],
+            field_name='username'
+        )
+        
+        with self.assertNumQueries(0):
+            for role_name, expected_modules in roles_and_modules:
+                user = users[f'user_{role_name.lower()}']
+                for module in expected_modules:
+                    self.assertTrue(
+                        user.has_module_permission(module),
+                        f"User with role {role_name} should have access to {module}"
+                    )
+                
+                # Test admin-specific permissions
+                if role_name == 'Administrador':
+                    self.assertTrue(user.can_delete_records())
+                    self.assertTrue(user.can_generate_reports())
+                else:
+                    self.assertFalse(user.can_delete_records())
+                    self.assertFalse(user.can_generate_reports())
@@ -7,8 +7,9 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample, OpenApiParameter
-from .models import Role, UserProfile
+from .models import ACTIVE_ROLES_CACHE_KEY, MODULE_FLAGS, Role, UserProfile
 from .serializers import (
     CustomTokenObtainPairSerializer,
     LoginSerializer,
@@ -22,6 +23,30 @@ from .serializers import (
 
 User = get_user_model()
 
+# Seconds a serialized auth_status user is kept; the signals drop it on changes.
+# Queryset update() and bulk_update() on users, profiles or roles send no
+# signals, so after such a write a payload can be stale for up to this long.
+# Bulk writes that must show at once have to delete the affected
+# get_auth_status_cache_key() entries themselves.
+AUTH_STATUS_CACHE_TIMEOUT = 300
+
+
+# Seconds the serialized active roles are kept; role writes drop them on changes
+ACTIVE_ROLES_CACHE_TIMEOUT = 3600
+
+
+def get_auth_status_cache_key(user_id):
+    """
+    Return the cache key of the auth_status payload of a user.
+    
+    Args:
+        user_id (int): Primary key of the user
+    
+    Returns:
+        str: Cache key for the serialized user
+    """
+    return f'auth_status:{user_id}'
+
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     """
@@ -39,6 +64,15 @@ class CustomTokenObtainPairView(TokenObtainPairView):
         para acceder a endpoints protegidos. El token de actualización permite obtener nuevos
         tokens de acceso sin reautenticarse.
         """,
+        parameters=[
+            OpenApiParameter(
+                name='user',
+                description='Usar "claims" para devolver solo los datos del usuario incluidos en el token',
+                required=False,
+                type=str,
+                enum=['claims']
+            ),
+        ],
         examples=[
             OpenApiExample(
                 'Ejemplo de login',
@@ -145,7 +179,7 @@ class LoginView(APIView):
             # Add custom claims
             access['username'] = user.username
             access['email'] = user.email
-            access['role'] = user.get_role_name() if user.role else None
+            access['role'] = user.get_role_name()
             access['employee_id'] = user.employee_id
             
             return Response({
@@ -166,6 +200,15 @@ class CustomTokenRefreshView(TokenRefreshView):
     @extend_schema(
         summary="Renovar token JWT",
         description="Renueva el token de acceso usando el token de actualización",
+        parameters=[
+            OpenApiParameter(
+                name='user',
+                description='Usar "claims" para devolver los datos del usuario incluidos en el token, sin consultar la base de datos',
+                required=False,
+                type=str,
+                enum=['claims']
+            ),
+        ],
         responses={
             200: OpenApiResponse(description="Token renovado exitosamente"),
             401: OpenApiResponse(description="Token de actualización inválido"),
@@ -280,7 +323,7 @@ class UserRegistrationView(generics.CreateAPIView):
     
     def perform_create(self, serializer):
         # Only administrators can create users
-        if not self.request.user.has_role('Administrador') and not self.request.user.is_superuser:
+        if not self.request.user.has_role(Role.ADMINISTRADOR) and not self.request.user.is_superuser:
             raise PermissionDenied("Solo los administradores pueden crear usuarios.")
         serializer.save()
     
@@ -310,6 +353,33 @@ class RoleListView(generics.ListAPIView):
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
+    
+    def list(self, request, *args, **kwargs):
+        """
+        List the active roles from the cached serialized list.
+        
+        There are only a handful of roles and they rarely change, so the
+        whole list is serialized once and each page is cut from it. The
+        cache holds the unfiltered list only; a request with any query
+        parameter other than the pagination ones is listed normally.
+        """
+        paginator = self.paginator
+        pagination_params = {
+            getattr(paginator, 'page_query_param', None),
+            getattr(paginator, 'page_size_query_param', None),
+        }
+        if any(param not in pagination_params for param in request.query_params):
+            return super().list(request, *args, **kwargs)
+        
+        roles_data = cache.get(ACTIVE_ROLES_CACHE_KEY)
+        if roles_data is None:
+            roles_data = self.get_serializer(self.get_queryset(), many=True).data
+            cache.set(ACTIVE_ROLES_CACHE_KEY, roles_data, ACTIVE_ROLES_CACHE_TIMEOUT)
+        
+        page = self.paginate_queryset(roles_data)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(roles_data)
 
 
 @extend_schema(
@@ -325,8 +395,16 @@ class RoleListView(generics.ListAPIView):
 def auth_status(request):
     """
     Check authentication status and return user info.
+    
+    Clients poll this view, so the serialized user is cached until the
+    user, its profile or its role changes.
     """
-    user_data = UserSerializer(request.user).data
+    cache_key = get_auth_status_cache_key(request.user.pk)
+    user_data = cache.get(cache_key)
+    if user_data is None:
+        user_data = UserSerializer(request.user).data
+        cache.set(cache_key, user_data, AUTH_STATUS_CACHE_TIMEOUT)
+    
     return Response({
         'authenticated': True,
         'user': user_data
@@ -348,13 +426,12 @@ def user_permissions(request):
     Get user permissions for different modules.
     """
     user = request.user
-    modules = ['pollination', 'germination', 'alerts', 'reports', 'authentication']
     
     permissions_data = {
         'role': user.get_role_name(),
         'modules': {
             module: user.has_module_permission(module) 
-            for module in modules
+            for module in MODULE_FLAGS
         },
         'can_delete_records': user.can_delete_records(),
         'can_generate_reports': user.can_generate_reports(),
@@ -100,6 +100,9 @@ def demo_error_handling():
     
     print(f"\nTesting {len(test_cases)} different error scenarios...\n")
     
+    # Every scenario posts the same body, so it is encoded once
+    request_body = json.dumps({'test': 'data'})
+    
     for i, test_case in enumerate(test_cases, 1):
         print(f"{i}. {test_case['name']}")
         print(f"   Description: {test_case['description']}")
@@ -107,7 +110,7 @@ def demo_error_handling():
         # Create API request
         request = factory.post(
             '/api/test/',
-            data=json.dumps({'test': 'data'}),
+            data=request_body,
             content_type='application/json',
             HTTP_ACCEPT='application/json'
         )
@@ -1,3 +1,4 @@
+import copy
 import factory
 from django.contrib.auth import get_user_model
 from authentication.models import Role, UserProfile
@@ -23,7 +24,7 @@ class RoleFactory(factory.django.DjangoModelFactory):
             return
         
         if not obj.permissions:
-            obj.permissions = obj.get_default_permissions()
+            obj.permissions = copy.deepcopy(dict(obj.get_default_permissions()))
             obj.save()
 
 
@@ -5,6 +5,7 @@ This package contains environment-specific settings configurations:
 - base.py: Common settings shared across all environments
 - development.py: Development-specific settings
 - production.py: Production-specific settings
+- test_settings.py: Test settings (in-memory database, MD5 password hasher)
 
 The appropriate settings module is loaded based on the DJANGO_SETTINGS_MODULE
 environment variable or defaults to development settings.
@@ -20,6 +21,8 @@ if ENVIRONMENT == 'production':
     from .production import *
 elif ENVIRONMENT == 'development':
     from .development import *
+elif ENVIRONMENT == 'test':
+    from .test_settings import *
 else:
     # Default to development
     from .development import *
\ No newline at end of file
@@ -16,6 +16,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': ':memory:',
+        # Keep the test database in memory even if NAME points to a file
+        'TEST': {
+            'NAME': ':memory:',
+        },
     }
 }
 